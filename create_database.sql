@@ -84,4 +84,67 @@ CREATE TABLE organization_payments (
   method VARCHAR(50),                  -- e.g. 'stripe', 'manual', 'promo'
   reference TEXT,                      -- e.g. Stripe session ID or admin note
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+CREATE TABLE jobs (
+  id SERIAL PRIMARY KEY,
+  kind VARCHAR(50) NOT NULL,               -- e.g. 'process_interview'
+  payload JSONB NOT NULL,
+  org_id INTEGER REFERENCES organizations(id) ON DELETE CASCADE,
+  status VARCHAR(10) NOT NULL DEFAULT 'queued',   -- queued, running, done, failed
+  attempts INT NOT NULL DEFAULT 0,
+  max_attempts INT NOT NULL DEFAULT 3,
+  run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  locked_by VARCHAR(255),
+  locked_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX jobs_queued_idx ON jobs (run_after, id) WHERE status = 'queued';
+CREATE INDEX jobs_org_idx ON jobs (org_id, id);
+
+CREATE TABLE chunk_results (
+  interview_id INT REFERENCES interviews(id) ON DELETE CASCADE,
+  respondent_hash VARCHAR(255) NOT NULL,
+  attempt INT NOT NULL,
+  question_num INT NOT NULL,
+  chunk_index INT NOT NULL,
+  status VARCHAR(10) NOT NULL,             -- done, silent, failed
+  transcript TEXT,
+  stt_price FLOAT NOT NULL DEFAULT 0,
+  stt_duration_sec FLOAT NOT NULL DEFAULT 0,
+  reencoded BOOLEAN NOT NULL DEFAULT FALSE, -- normalized copy stored under attempt_<n>/fixed/
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (interview_id, respondent_hash, attempt, question_num, chunk_index)
+);
+
+CREATE TABLE process_checkpoints (
+  interview_id INT REFERENCES interviews(id) ON DELETE CASCADE,
+  respondent_hash VARCHAR(255) NOT NULL,
+  attempt INT NOT NULL,
+  stage VARCHAR(20) NOT NULL,              -- transcription, rating, video, upload, billing
+  data JSONB NOT NULL,                     -- {"result": stage output, "cost": cost_log entries it produced}
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (interview_id, respondent_hash, attempt, stage)
+);
+
+CREATE TABLE respondent_attempts (
+  interview_id INT REFERENCES interviews(id) ON DELETE CASCADE,
+  respondent_hash VARCHAR(255) NOT NULL,
+  attempt INT NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (interview_id, respondent_hash, attempt)
+);
+
+CREATE TABLE attempt_chunks (
+  interview_id INT REFERENCES interviews(id) ON DELETE CASCADE,
+  respondent_hash VARCHAR(255) NOT NULL,
+  attempt INT NOT NULL,
+  question_num INT NOT NULL,
+  chunk_index INT NOT NULL,
+  size_bytes BIGINT,
+  uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (interview_id, respondent_hash, attempt, question_num, chunk_index)
+);
@@ -1,18 +1,22 @@
 from flask import Flask, request, jsonify, session
 from flask_cors import CORS
 from dotenv import load_dotenv
-import threading, uuid, os, traceback
+import uuid, os, traceback
 from services.interview_manager import InterviewManager
 from services.questions_manager import QuestionsManager
 from services.answer_manager import AnswersManager
-from services.process_manager import ProcessManager
 from services.organizations_manager import OrganizationManager
 from services.interview_generator import InterviewGenerator
 from services.interview_viewer import InterviewViewer
 from services.respondent_viewer import RespondentViewer
+from entities import enqueue_job, get_jobs_for_org
 
 load_dotenv()
 
+DIRECT_UPLOAD_CHUNKS = int(os.getenv("DIRECT_UPLOAD_CHUNKS", 40))  # signed URLs per question, 15s each
+PROCESS_DELAY_SEC = int(os.getenv("PROCESS_DELAY_SEC", 10))
+INCREMENTAL_PROCESSING = os.getenv("INCREMENTAL_PROCESSING", "false").lower() == "true"  # transcribe chunks as they arrive
+
 app = Flask(__name__)
 
 app.secret_key = os.getenv("APP_SECRET_KEY")
@@ -170,19 +174,18 @@ def build_interview():
 
         generator = InterviewGenerator(org_id=session["org_id"])
         generator.apply_result(data)
+        generator.insert_interview_to_db()
 
-        def async_process():
-            try:
-                generator.insert_interview_to_db()
-                generator.build()
-                print(f"✅ Interview #{generator.interview_id} built successfully")
-            except Exception as e:
-                print(f"❌ Interview build failed: {e}")
-
-        threading.Thread(target=async_process).start()
+        # TTS + upload run in worker.py, not in the HTTP worker
+        enqueue_job(
+            "build_interview",
+            {"organization_id": session["org_id"], "interview_id": generator.interview_id, "resume": False},
+            org_id=session["org_id"]
+        )
 
         return jsonify({
             "status": "ok",
+            "interview_id": generator.interview_id,
             "interview": data  # echo back for now
         })
 
@@ -192,6 +195,24 @@ def build_interview():
         return jsonify({"error": "Build failed", "detail": str(e)}), 500
 
 
+@app.route("/api/build-interview/<int:interview_id>/resume", methods=["POST"])
+def resume_build_interview(interview_id):
+    if "org_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 403
+
+    try:
+        InterviewGenerator.from_interview(session["org_id"], interview_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+    enqueue_job(
+        "build_interview",
+        {"organization_id": session["org_id"], "interview_id": interview_id, "resume": True},
+        org_id=session["org_id"]
+    )
+
+    return jsonify({"status": "ok"})
+
 @app.route("/api/interview-session", methods=["POST"])
 def interview_session():
     data = request.get_json()
@@ -207,7 +228,7 @@ def interview_session():
 
 @app.route("/api/get-questions", methods=["POST"])
 def get_questions_route():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     org_id = data.get("o")
     interview_id = data.get("i")
     uuid = data.get("uuid")
@@ -216,37 +237,66 @@ def get_questions_route():
     if not org_id or not interview_id or not uuid:
         return jsonify({"error": "Missing required fields"}), 400
 
+    try:
+        chunks = min(int(data.get("chunks") or DIRECT_UPLOAD_CHUNKS), DIRECT_UPLOAD_CHUNKS)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid chunks"}), 400
+
     qm = QuestionsManager(org_id, interview_id, uuid, respondent_exists)
-    attempt = qm.prepare_respondent()
-    ready = qm.wait_for_ready(attempt)
+    attempt, ready = qm.prepare_respondent()
 
     questions = qm.get_questions()
     texts = [q["question"] for q in questions]
     urls = qm.generate_signed_urls(questions)
 
-    return jsonify({
+    response = {
         "ready": ready,
         "attempt": attempt,
         "questions": texts,
         "urls": urls
-    })
+    }
+
+    if data.get("direct_upload"):
+        response["upload_urls"] = qm.generate_upload_urls(attempt, questions, chunks)
+
+    return jsonify(response)
 
 @app.route('/api/upload-chunk', methods=['POST'])
 def upload_chunk():
     try:
-        file = request.files['file']
-        attempt = int(request.form['attempt'])
-        question_num = int(request.form['question_num'])
-        chunk_index = int(request.form['chunk_index'])
-        uuid = request.form['uuid']
-        org_id = int(request.args.get('o'))
-        interview_id = int(request.args.get('i'))
-
-        if not all([file, uuid, org_id, interview_id]):
+        try:
+            if request.mimetype == "video/webm":
+                # Raw body upload: fields travel in the query string and the body
+                # is piped to storage as it arrives. This is the only path that
+                # never touches disk.
+                fields = request.args
+                stream = request.stream
+                size = request.content_length
+            else:
+                # Multipart: werkzeug has already parsed the whole file, spooling
+                # larger parts to a temp file on disk
+                fields = request.form
+                stream = request.files['file'].stream
+                size = stream.seek(0, os.SEEK_END)
+                stream.seek(0)
+
+            attempt = int(fields['attempt'])
+            question_num = int(fields['question_num'])
+            chunk_index = int(fields['chunk_index'])
+            uuid = fields['uuid']
+            md5 = fields.get('md5')
+            org_id = int(request.args.get('o'))
+            interview_id = int(request.args.get('i'))
+        except (KeyError, TypeError, ValueError):
+            return "Missing or invalid fields", 400
+
+        if not all([stream, uuid, org_id, interview_id]):
             return "Missing required fields", 400
 
         manager = AnswersManager(org_id, interview_id, uuid)
-        manager.save_chunk(attempt, question_num, chunk_index, file)
+        manager.save_chunk(attempt, question_num, chunk_index, stream, md5, size)
+        if INCREMENTAL_PROCESSING:
+            manager.queue_chunk_processing(attempt, question_num, chunk_index)
 
         return '', 204
 
@@ -255,6 +305,31 @@ def upload_chunk():
         traceback.print_exc() 
         return f"Upload failed: {str(e)}", 500
 
+@app.route('/api/chunk-uploaded', methods=['POST'])
+def chunk_uploaded():
+    data = request.get_json(silent=True) or {}
+    uuid = data.get('uuid')
+
+    try:
+        org_id = int(data['o'])
+        interview_id = int(data['i'])
+        attempt = int(data['attempt'])
+        question_num = int(data['question_num'])
+        chunk_index = int(data['chunk_index'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Missing or invalid fields"}), 400
+
+    if not all([org_id, interview_id, uuid, attempt]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    manager = AnswersManager(org_id, interview_id, uuid)
+    if not manager.confirm_chunk(attempt, question_num, chunk_index):
+        return jsonify({"error": "Chunk not found"}), 404
+    if INCREMENTAL_PROCESSING:
+        manager.queue_chunk_processing(attempt, question_num, chunk_index)
+
+    return '', 204
+
 @app.route('/api/close-interview', methods=['POST'])
 def close_interview():
     data = request.get_json()
@@ -284,11 +359,33 @@ def api_process_interview(organization_id, interview_id, user_id, attempt):
     process_interview(organization_id, interview_id, user_id, attempt, False)
     return {"r": "none"}, 200
 
-def process_interview(organization_id, interview_id, user_id, attempt, integration):    
-    process = ProcessManager(organization_id, interview_id, user_id, attempt, integration)
-    if process.valid == False: print("Invalid")
-    threading.Thread(target=lambda: process.process(), daemon=True).start()
-    return
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    if "org_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 403
+    return jsonify(get_jobs_for_org(session["org_id"]))
+
+def process_interview(organization_id, interview_id, user_id, attempt, integration):
+    # Picked up by worker.py; the delay lets the last chunks finish uploading
+    job_id = enqueue_job(
+        "process_interview",
+        {
+            "organization_id": organization_id,
+            "interview_id": interview_id,
+            "user_id": user_id,
+            "attempt": attempt,
+            "integration": integration
+        },
+        org_id=int(organization_id),
+        delay_sec=PROCESS_DELAY_SEC
+    )
+    print(f"📥 Queued processing job #{job_id} for {user_id}")
+    return job_id
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=9091, debug=True)
+    # Development server only; production runs gunicorn -c gunicorn.conf.py app:app
+    app.run(
+        host='0.0.0.0',
+        port=int(os.getenv("FLASK_SERVER_PORT", 9091)),
+        debug=os.getenv("FLASK_DEBUG", "false").lower() == "true"
+    )
@@ -1,66 +1,132 @@
 from .db import (
-    run_query
+    run_query,
+    transaction,
 )
 
 from .storage import (
     create_org_bucket,
     get_bucket,
+    get_bucket_by_name,
+    invalidate_bucket,
     blob_exists,
     create_empty_blob,
     upload_string,
     upload_file_to_path,
     get_signed_url,
+    get_signed_urls,
     load_file_as_string,
+    load_file_as_bytes,
     list_blobs,
     get_last_attempt,
     upload_blob_from_bytes,
+    upload_stream,
+    download_blob,
+    download_blobs,
+)
+
+from .http_client import (
+    get_session,
+    http_get,
+    http_post,
 )
 
 from .ai import (
     init_openai,
     init_whisper,
+    get_whisper_pool,
     synthesize_voice,
+    tts_cache_key,
     list_available_voices,
     silence_prob,
     respond_with_ai,
     deepgram_transcribe,
 )
 
+from .audio import (
+    detect_speech,
+    speech_activity,
+    trim_to_speech,
+    prepare_chunk_audio,
+    pcm_to_samples,
+    trim_pcm_to_speech,
+    VAD_SAMPLE_RATE,
+    VAD_SILENT_BELOW,
+    VAD_CONFIRM_BELOW,
+    VAD_TRIM_SILENCE,
+)
+
 from .video import (
+    MediaInfo,
+    probe,
     get_real_duration,
     has_frames,
     needs_fixing,
     reencode_webm,
+    normalize_chunk,
+    concat_copy,
+    concat_reencode,
     sort_webm_files,
     sorting_key,
     convert_webm_to_wav,
+    decode_to_pcm,
+    extract_audio_webm,
 )
 
 __all__ = [
     "run_query",
+    "transaction",
     "create_org_bucket",
     "get_bucket",
+    "get_bucket_by_name",
+    "invalidate_bucket",
     "blob_exists",
     "create_empty_blob",
     "upload_string",
     "upload_file_to_path",
     "get_signed_url",
+    "get_signed_urls",
     "load_file_as_string",
+    "load_file_as_bytes",
     "list_blobs",
     "get_last_attempt",
     "upload_blob_from_bytes",
+    "upload_stream",
+    "download_blob",
+    "download_blobs",
+    "get_session",
+    "http_get",
+    "http_post",
     "init_openai",
     "init_whisper",
+    "get_whisper_pool",
     "synthesize_voice",
+    "tts_cache_key",
     "list_available_voices",
     "silence_prob",
     "respond_with_ai",
     "deepgram_transcribe",
+    "detect_speech",
+    "speech_activity",
+    "trim_to_speech",
+    "prepare_chunk_audio",
+    "pcm_to_samples",
+    "trim_pcm_to_speech",
+    "VAD_SAMPLE_RATE",
+    "VAD_SILENT_BELOW",
+    "VAD_CONFIRM_BELOW",
+    "VAD_TRIM_SILENCE",
+    "MediaInfo",
+    "probe",
     "get_real_duration",
     "has_frames",
     "needs_fixing",
     "reencode_webm",
+    "normalize_chunk",
+    "concat_copy",
+    "concat_reencode",
     "sort_webm_files",
     "sorting_key",
     "convert_webm_to_wav",
+    "decode_to_pcm",
+    "extract_audio_webm",
 ]
\ No newline at end of file
@@ -1,18 +1,46 @@
-import os, openai, requests, json
+import os, openai, json, threading, queue, time, re, hashlib
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from faster_whisper import WhisperModel
+from .http_client import http_get, http_post
 
 load_dotenv()
 
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))  # 0 = CTranslate2 default
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", 1))
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", 500))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", 30000))
+
+WHISPER_DOWNLOAD_ROOT = os.getenv("WHISPER_DOWNLOAD_ROOT", "/models/models--Systran--faster-whisper-tiny")
+
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 DEEPGRAM_LANGS = {"en", "ru", "fr", "de", "es", "it", "pt", "nl"}
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = None
+ELEVENLABS_VOICE_NAME = os.getenv("ELEVENLABS_VOICE_NAME", "Rachel")
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.3,
+    "similarity_boost": 0.65,
+    "style": 0.35,
+    "use_speaker_boost": True
+}
+
+def tts_cache_key(text):
+    """Content address of a synthesized clip: same text, voice, model and settings give the same key."""
+    material = json.dumps({
+        "text": text,
+        "voice": ELEVENLABS_VOICE_NAME,
+        "model": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
 def synthesize_voice(text):
     global ELEVENLABS_VOICE_ID
     if ELEVENLABS_VOICE_ID is None:
-        ELEVENLABS_VOICE_ID = get_voice_id_by_name("Rachel")
+        ELEVENLABS_VOICE_ID = get_voice_id_by_name(ELEVENLABS_VOICE_NAME)
 
     url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
     headers = {
@@ -23,16 +51,11 @@ def synthesize_voice(text):
 
     payload = {
         "text": text,
-        "model_id": "eleven_multilingual_v2",
-        "voice_settings": {
-            "stability": 0.3,
-            "similarity_boost": 0.65,
-            "style": 0.35,
-            "use_speaker_boost": True
-        }
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
     }
 
-    response = requests.post(url, headers=headers, json=payload)
+    response = http_post(url, headers=headers, json=payload)
     if response.status_code == 200:
         return response.content
     else:
@@ -41,13 +64,13 @@ def synthesize_voice(text):
 def list_available_voices():
     url = "https://api.elevenlabs.io/v2/voices"
     headers = { "xi-api-key": os.getenv("ELEVENLABS_API_KEY") }
-    response = requests.get(url, headers=headers)
+    response = http_get(url, headers=headers)
     voices = response.json().get("voices", [])
     for v in voices:
         print(f"- {v['name']} (ID: {v['voice_id']})")
 
 def get_voice_id_by_name(voice_name: str):
-    response = requests.get(
+    response = http_get(
         "https://api.elevenlabs.io/v2/voices", 
         headers={ "xi-api-key": ELEVENLABS_API_KEY }
     )
@@ -64,24 +87,173 @@ def get_voice_id_by_name(voice_name: str):
 def init_openai():
     return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def init_whisper():
+def load_whisper_model():
+    # Imported here so API-only processes never load CTranslate2
+    from faster_whisper import WhisperModel
     return WhisperModel(
-        "tiny",
-        compute_type="int8",
-        download_root="/models/models--Systran--faster-whisper-tiny"
+        WHISPER_MODEL_SIZE,
+        compute_type=WHISPER_COMPUTE_TYPE,
+        cpu_threads=WHISPER_CPU_THREADS,
+        download_root=WHISPER_DOWNLOAD_ROOT
     )
 
-def silence_prob(path, whisper_model, language=None):
+class WhisperPool:
+    """
+    Per-process pool of Whisper models. Models are loaded lazily, at most
+    `size` of them, and handed out one caller at a time via checkout().
+    """
+
+    def __init__(self, size=1):
+        self.size = max(size, 1)
+        self.loaded = 0
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        model = self._acquire(timeout)
+        try:
+            yield model
+        finally:
+            self.idle.put(model)
+
+    def _acquire(self, timeout):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            grow = self.loaded < self.size
+            if grow:
+                self.loaded += 1
+        if grow:
+            try:
+                return load_whisper_model()
+            except Exception:
+                with self.lock:
+                    self.loaded -= 1
+                raise
+
+        return self.idle.get(timeout=timeout)
+
+_whisper_pool = None
+_whisper_pool_lock = threading.Lock()
+
+def get_whisper_pool():
+    global _whisper_pool
+    if _whisper_pool is None:
+        with _whisper_pool_lock:
+            if _whisper_pool is None:
+                _whisper_pool = WhisperPool(WHISPER_POOL_SIZE)
+    return _whisper_pool
+
+def init_whisper():
+    """Warm up the shared pool so the first chunk doesn't pay the model load."""
+    pool = get_whisper_pool()
+    with pool.checkout():
+        pass
+    return pool
+
+def silence_prob(path, whisper_model=None, language=None):
+    # path may also be a float32 16 kHz sample array
     try:
-        segments, info = whisper_model.transcribe(path, language=language)
-        segments = list(segments)
+        if whisper_model is None:
+            with get_whisper_pool().checkout() as model:
+                segments, info = model.transcribe(path, language=language)
+                segments = list(segments)
+        else:
+            segments, info = whisper_model.transcribe(path, language=language)
+            segments = list(segments)
         return sum(s.no_speech_prob for s in segments) / max(len(segments), 1)
     except Exception as e:
         print(f"❌ Transcription failed for {path}: {e}")
         return 1.0
     
+class RateLimiter:
+    """
+    Token-bucket limiter for one OpenAI model, shared by every thread in the process.
+
+    Buckets refill continuously at rpm/tpm per minute. rpm/tpm are only the
+    starting guess: after each call capacity is set from the account's
+    x-ratelimit-limit-* headers and the buckets from x-ratelimit-remaining-*,
+    and when the server reports nothing left, callers wait until
+    x-ratelimit-reset-*.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.capacity = {"requests": rpm, "tokens": tpm}
+        self.available = dict(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        for key, cap in self.capacity.items():
+            self.available[key] = min(cap, self.available[key] + cap * elapsed / 60)
+        self.updated = now
+
+    def acquire(self, tokens):
+        tokens = min(tokens, self.capacity["tokens"])
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    missing_requests = 1 - self.available["requests"]
+                    missing_tokens = tokens - self.available["tokens"]
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        self.available["requests"] -= 1
+                        self.available["tokens"] -= tokens
+                        return
+                    wait = max(
+                        missing_requests * 60 / self.capacity["requests"],
+                        missing_tokens * 60 / self.capacity["tokens"]
+                    )
+            time.sleep(min(max(wait, 0.05), 5))
+
+    def update(self, headers):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            for key in ("requests", "tokens"):
+                limit = headers.get(f"x-ratelimit-limit-{key}")
+                if limit is not None and int(limit) > 0:
+                    self.capacity[key] = int(limit)
+                remaining = headers.get(f"x-ratelimit-remaining-{key}")
+                if remaining is None:
+                    continue
+                remaining = int(remaining)
+                # The server's count is authoritative, in either direction
+                self.available[key] = min(self.capacity[key], remaining)
+                if remaining <= 0:
+                    reset = _parse_reset(headers.get(f"x-ratelimit-reset-{key}"))
+                    self.blocked_until = max(self.blocked_until, now + reset)
+
+def _parse_reset(value):
+    # OpenAI reset headers look like "1s", "6m0s", "20ms"
+    if not value:
+        return 1.0
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(n) * units[u] for n, u in re.findall(r"([\d.]+)(ms|h|m|s)", value)) or 1.0
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(model):
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            _rate_limiters[model] = RateLimiter(OPENAI_RPM, OPENAI_TPM)
+        return _rate_limiters[model]
+
 def respond_with_ai(prompt, openai_client, max_tokens=500, model="gpt-4.1", role="user"):
-    response = openai_client.chat.completions.create(
+    limiter = get_rate_limiter(model)
+    # OpenAI counts max_tokens against the TPM limit up front
+    limiter.acquire(len(prompt) // 4 + max_tokens)
+
+    raw = openai_client.chat.completions.with_raw_response.create(
         model=model,
         messages=[{
             "role": role,
@@ -96,6 +268,8 @@ def respond_with_ai(prompt, openai_client, max_tokens=500, model="gpt-4.1", role
         frequency_penalty=0,
         presence_penalty=0
     )
+    limiter.update(raw.headers)
+    response = raw.parse()
 
     input_tokens = response.usage.prompt_tokens       # ← number of input tokens
     output_tokens = response.usage.completion_tokens   # ← number of output tokens
@@ -103,22 +277,38 @@ def respond_with_ai(prompt, openai_client, max_tokens=500, model="gpt-4.1", role
     print(in_cost, out_cost)
     return response.choices[0].message.content, in_cost, out_cost
 
-def deepgram_transcribe(wav_path, language="en"):
+def deepgram_transcribe(audio, language="en", content_type="audio/wav", sample_rate=None):
+    """
+    Transcribe a chunk with Deepgram.
+
+    Args:
+        audio: Path of a file (streamed from disk, never read into memory)
+            or bytes already in memory (e.g. an audio-only webm from ffmpeg).
+        content_type (str): MIME type of the audio, e.g. "audio/webm".
+        sample_rate (int, optional): Set for headerless 16-bit PCM; sent as
+            linear16 encoding parameters.
+    """
     # if language not in DEEPGRAM_LANGS:
     #     print(f"⚠️ Language '{language}' not supported by Deepgram")
     #     return None
 
     url = f"https://api.deepgram.com/v1/listen?model=nova-3&language=multi"
+    if sample_rate:
+        url += f"&encoding=linear16&sample_rate={sample_rate}&channels=1"
+        content_type = "application/octet-stream"
+
     headers = {
         "Authorization": f"Token {DEEPGRAM_API_KEY}",
-        "Content-Type": "audio/wav"
+        "Content-Type": content_type
     }
+    source = audio if isinstance(audio, str) else f"<{len(audio)} bytes>"
 
     try:
-        with open(wav_path, "rb") as f:
-            audio = f.read()
-
-        response = requests.post(url, headers=headers, data=audio)
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                response = http_post(url, headers=headers, data=f)
+        else:
+            response = http_post(url, headers=headers, data=audio)
         response.raise_for_status()
 
         data = response.json()
@@ -127,7 +317,7 @@ def deepgram_transcribe(wav_path, language="en"):
 
         return text, deepgram_cost(duration), duration
     except Exception as e:
-        print(f"❌ Deepgram STT failed for {wav_path}: {e}")
+        print(f"❌ Deepgram STT failed for {source}: {e}")
         return None, 0.0, 0.0
 
 def deepgram_cost(duration):
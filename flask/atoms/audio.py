@@ -0,0 +1,170 @@
+import os, wave
+import numpy as np
+from dotenv import load_dotenv
+from .video import convert_webm_to_wav, decode_to_pcm
+
+load_dotenv()
+
+VAD_FRAME_MS = 30
+VAD_MIN_SPEECH_MS = 120     # shorter bursts are treated as clicks/noise
+VAD_MAX_GAP_MS = 300        # pauses shorter than this stay inside one segment
+VAD_MIN_DBFS = float(os.getenv("VAD_MIN_DBFS", -50))
+VAD_MAX_DBFS = float(os.getenv("VAD_MAX_DBFS", -35))   # keeps all-speech chunks from raising the floor
+VAD_NOISE_MARGIN_DB = float(os.getenv("VAD_NOISE_MARGIN_DB", 10))
+VAD_BAND_RATIO = float(os.getenv("VAD_BAND_RATIO", 0.6))
+
+VAD_SILENT_BELOW = float(os.getenv("VAD_SILENT_BELOW", 0.02))    # speech ratio treated as silence
+VAD_CONFIRM_BELOW = float(os.getenv("VAD_CONFIRM_BELOW", 0.10))  # borderline ratios are re-checked with Whisper
+VAD_TRIM_SILENCE = os.getenv("VAD_TRIM_SILENCE", "false").lower() == "true"
+VAD_SAMPLE_RATE = 16000
+
+def read_wav(path):
+    """
+    Read a 16-bit PCM wav (as produced by convert_webm_to_wav).
+
+    Returns:
+        tuple: (mono float32 samples in [-1, 1], sample rate)
+    """
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"Unsupported sample width {wf.getsampwidth()} in {path}")
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        raw = wf.readframes(wf.getnframes())
+
+    samples = pcm_to_samples(raw)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+def pcm_to_samples(pcm):
+    """16-bit little-endian PCM bytes -> float32 samples in [-1, 1]."""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+def samples_to_pcm(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+def write_wav(path, samples, rate):
+    pcm = samples_to_pcm(samples)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+
+def detect_speech(samples, rate):
+    """
+    Energy + spectral voice activity detection.
+
+    A frame is speech when it is louder than the adaptive noise floor
+    (10th percentile frame energy + VAD_NOISE_MARGIN_DB, clamped to
+    VAD_MIN_DBFS..VAD_MAX_DBFS) and most of its energy sits in the 85-3800 Hz voice band.
+
+    Returns:
+        dict: {"duration": sec, "speech_ratio": 0..1, "segments": [(start, end), ...]}
+    """
+    frame_len = int(rate * VAD_FRAME_MS / 1000)
+    n_frames = len(samples) // frame_len
+    duration = len(samples) / rate if rate else 0.0
+
+    if n_frames == 0:
+        return {"duration": duration, "speech_ratio": 0.0, "segments": []}
+
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+
+    energy = np.mean(frames ** 2, axis=1)
+    dbfs = 10 * np.log10(energy + 1e-10)
+    threshold = np.clip(np.percentile(dbfs, 10) + VAD_NOISE_MARGIN_DB, VAD_MIN_DBFS, VAD_MAX_DBFS)
+
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_len), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(frame_len, 1 / rate)
+    band = (freqs >= 85) & (freqs <= 3800)
+    band_ratio = spectrum[:, band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-10)
+
+    voiced = (dbfs > threshold) & (band_ratio > VAD_BAND_RATIO)
+    segments = _frames_to_segments(voiced, VAD_FRAME_MS / 1000)
+    speech_sec = sum(end - start for start, end in segments)
+
+    return {
+        "duration": duration,
+        "speech_ratio": min(float(speech_sec) / duration, 1.0) if duration else 0.0,
+        "segments": segments
+    }
+
+def _frames_to_segments(voiced, frame_sec):
+    # Rising/falling edges of the voiced mask
+    padded = np.concatenate(([False], voiced, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    merged = []
+    max_gap = VAD_MAX_GAP_MS / 1000 / frame_sec
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_len = VAD_MIN_SPEECH_MS / 1000 / frame_sec
+    return [
+        (round(float(start * frame_sec), 3), round(float(end * frame_sec), 3))
+        for start, end in merged
+        if end - start >= min_len
+    ]
+
+def speech_activity(wav_path):
+    """Run detect_speech on a wav file."""
+    samples, rate = read_wav(wav_path)
+    return detect_speech(samples, rate)
+
+def trim_to_speech(wav_path, segments, output_path=None, padding=0.25):
+    """
+    Write a wav containing only the detected speech segments (each padded by
+    `padding` seconds), so STT isn't billed for silence.
+
+    Returns:
+        str: Path of the trimmed wav.
+    """
+    if not output_path:
+        output_path = wav_path.replace(".wav", ".speech.wav")
+
+    samples, rate = read_wav(wav_path)
+    write_wav(output_path, _keep_speech(samples, rate, segments, padding), rate)
+    return output_path
+
+def trim_pcm_to_speech(pcm, segments, rate=VAD_SAMPLE_RATE, padding=0.25):
+    """In-memory variant of trim_to_speech for raw 16-bit PCM."""
+    return samples_to_pcm(_keep_speech(pcm_to_samples(pcm), rate, segments, padding))
+
+def _keep_speech(samples, rate, segments, padding):
+    ranges = []
+    for start, end in segments:
+        start, end = max(start - padding, 0), end + padding
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    parts = [samples[int(start * rate):int(end * rate)] for start, end in ranges]
+    return np.concatenate(parts) if parts else samples[:0]
+
+def prepare_chunk_audio(webm_path, wav_path=None):
+    """
+    Decode a webm chunk and run VAD on it. Picklable entry point for the process pool.
+
+    With wav_path the chunk is converted to a 16 kHz wav on disk (legacy flow).
+    Without it the chunk is decoded in memory; the PCM is only returned when a
+    later step needs it (silence trimming or a borderline Whisper check).
+
+    Returns:
+        tuple: (wav_path or PCM bytes or None, detect_speech result)
+    """
+    if wav_path:
+        convert_webm_to_wav(webm_path, wav_path)
+        return wav_path, speech_activity(wav_path)
+
+    pcm = decode_to_pcm(webm_path, VAD_SAMPLE_RATE)
+    vad = detect_speech(pcm_to_samples(pcm), VAD_SAMPLE_RATE)
+    borderline = VAD_SILENT_BELOW <= vad["speech_ratio"] < VAD_CONFIRM_BELOW
+    return (pcm if VAD_TRIM_SILENCE or borderline else None), vad
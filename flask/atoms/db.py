@@ -1,5 +1,7 @@
-import os
+import os, threading, time
 import psycopg2
+from contextlib import contextmanager
+from psycopg2.pool import PoolError
 from psycopg2.errors import UniqueViolation, ForeignKeyViolation
 from dotenv import load_dotenv
 
@@ -14,13 +16,238 @@ def get_db_config():
         "port": os.getenv("POSTGRESQL_PORT", 5432)
     }
 
+def get_pool_config():
+    return {
+        "minconn": int(os.getenv("POSTGRESQL_POOL_MIN", 1)),
+        "maxconn": int(os.getenv("POSTGRESQL_POOL_MAX", 10)),
+        "timeout": float(os.getenv("POSTGRESQL_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.getenv("POSTGRESQL_POOL_MAX_IDLE", 300)),
+        "max_lifetime": float(os.getenv("POSTGRESQL_POOL_MAX_LIFETIME", 3600)),
+        "check_after": float(os.getenv("POSTGRESQL_POOL_CHECK_AFTER", 30)),
+    }
+
 def get_conn():
     """Return a psycopg2 connection using env variables."""
     return psycopg2.connect(**get_db_config())
 
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    - minconn / maxconn: bounds on open connections
+    - timeout: seconds to wait for a free connection before raising PoolError
+    - max_idle: idle connections above minconn are closed after this many seconds
+    - max_lifetime: connections are recycled once they are this old
+    - check_after: connections idle longer than this are pinged before reuse
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=10, max_idle=300, max_lifetime=3600, check_after=30):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+
+        self._idle = []        # [(conn, returned_at)], most recently used last
+        self._created = {}     # id(conn) -> created_at, for every open connection
+        self._reserved = []    # placeholders holding slots for connections being opened
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, conn, now):
+        return now - self._created.get(id(conn), now) > self.max_lifetime
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _prune_idle(self, now):
+        keep = []
+        for conn, returned_at in self._idle:
+            surplus = len(self._created) > self.minconn
+            if surplus and now - returned_at > self.max_idle:
+                self._discard(conn)
+            else:
+                keep.append((conn, returned_at))
+        self._idle = keep
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, stale = self._checkout(deadline)
+            if conn is None:
+                break
+            # Ping outside the lock so a slow server doesn't stall other threads
+            if not stale or self._healthy(conn):
+                return conn
+            with self._cond:
+                self._discard(conn)
+                self._cond.notify()
+
+        conn = None
+        try:
+            conn = get_conn()
+        finally:
+            with self._cond:
+                self._created.pop(id(self._reserved.pop()), None)
+                if conn is not None:
+                    self._created[id(conn)] = time.monotonic()
+                self._cond.notify()
+        return conn
+
+    def _checkout(self, deadline):
+        """Return (idle_conn, needs_ping), or (None, False) once a new connection slot is reserved."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                now = time.monotonic()
+                self._prune_idle(now)
+
+                while self._idle:
+                    conn, returned_at = self._idle.pop()
+                    if conn.closed or self._expired(conn, now):
+                        self._discard(conn)
+                        continue
+                    return conn, now - returned_at > self.check_after
+
+                if len(self._created) < self.maxconn:
+                    # Reserve the slot before releasing the lock to connect
+                    placeholder = object()
+                    self._reserved.append(placeholder)
+                    self._created[id(placeholder)] = now
+                    return None, False
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolError(f"Timed out after {self.timeout}s waiting for a database connection")
+                self._cond.wait(remaining)
+
+    def putconn(self, conn, discard=False):
+        with self._cond:
+            now = time.monotonic()
+            if discard or self._closed or conn.closed or self._expired(conn, now):
+                self._discard(conn)
+            else:
+                self._idle.append((conn, now))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use (and again after fork)."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(**get_pool_config())
+            _pool_pid = os.getpid()
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+@contextmanager
+def pooled_connection():
+    """
+    Check a connection out of the pool, commit on success and roll back on error.
+    Broken connections are dropped instead of being returned to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+_local = threading.local()
+
+@contextmanager
+def transaction():
+    """
+    Run every run_query call inside the block on one connection and commit once.
+
+    Nested transaction() blocks become savepoints: an exception inside a nested
+    block rolls back only that block, the outer transaction stays usable.
+
+    Usage:
+        with transaction():
+            run_query(...)
+            run_query(...)
+    """
+    conn = getattr(_local, "conn", None)
+
+    if conn is not None:
+        _local.depth += 1
+        savepoint = f"sp_{_local.depth}"
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield conn
+            except Exception:
+                with conn.cursor() as cur:
+                    cur.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                raise
+            with conn.cursor() as cur:
+                cur.execute(f"RELEASE SAVEPOINT {savepoint}")
+        finally:
+            _local.depth -= 1
+        return
+
+    with pooled_connection() as conn:
+        _local.conn = conn
+        _local.depth = 0
+        try:
+            yield conn
+        finally:
+            _local.conn = None
+
 def run_query(query, params=None, fetch_one=False, fetch_all=False):
     """
-    Execute a query safely with automatic connection and cursor handling.
+    Execute a query safely with pooled connection and cursor handling.
+    Inside a transaction() block the query runs on the transaction's connection
+    and is committed together with the rest of the block.
 
     - query: SQL query string
     - params: tuple of parameters
@@ -28,27 +255,33 @@ def run_query(query, params=None, fetch_one=False, fetch_all=False):
     - fetch_all: return all results (list of dicts)
     """
     try:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params or ())
-
-                if fetch_one:
-                    row = cur.fetchone()
-                    if not row:
-                        return None
-                    cols = [desc[0] for desc in cur.description]
-                    return dict(zip(cols, row))
-
-                if fetch_all:
-                    rows = cur.fetchall()
-                    cols = [desc[0] for desc in cur.description]
-                    return [dict(zip(cols, r)) for r in rows]
+        conn = getattr(_local, "conn", None)
+        if conn is not None:
+            return _execute(conn, query, params, fetch_one, fetch_all)
 
-                conn.commit()
-                return None
+        with pooled_connection() as conn:
+            return _execute(conn, query, params, fetch_one, fetch_all)
     except UniqueViolation:
         raise ValueError(f"Already exists")
     except ForeignKeyViolation:
         raise ValueError(f"Invalid foreign key")
     except Exception as e:
         raise RuntimeError(f"Failed to insert: {str(e)}")
+
+def _execute(conn, query, params, fetch_one, fetch_all):
+    with conn.cursor() as cur:
+        cur.execute(query, params or ())
+
+        if fetch_one:
+            row = cur.fetchone()
+            if not row:
+                return None
+            cols = [desc[0] for desc in cur.description]
+            return dict(zip(cols, row))
+
+        if fetch_all:
+            rows = cur.fetchall()
+            cols = [desc[0] for desc in cur.description]
+            return [dict(zip(cols, r)) for r in rows]
+
+        return None
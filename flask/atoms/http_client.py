@@ -0,0 +1,87 @@
+import os, threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 120))
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+_sessions = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+
+def _retry_policy(post):
+    if post:
+        # POSTs (TTS synthesis, transcription) are billed per request: only retry
+        # when the server cannot have run it - connect errors and 429/503 -
+        # never after a read timeout or a 5xx that may have done the work
+        return Retry(
+            total=HTTP_RETRIES,
+            read=0,
+            other=0,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    return Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+def _build_session(post=False):
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=_retry_policy(post),
+        timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(url, post=False):
+    """
+    Return the keep-alive session for the URL's host, shared by all threads of
+    the process. Connections are reused across calls; sessions are rebuilt after fork.
+    POSTs get their own session with a stricter retry policy (see _retry_policy).
+    """
+    global _sessions_pid
+    key = (urlsplit(url).netloc, post)
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        if key not in _sessions:
+            _sessions[key] = _build_session(post)
+        return _sessions[key]
+
+def http_get(url, **kwargs):
+    return get_session(url).get(url, **kwargs)
+
+def http_post(url, **kwargs):
+    return get_session(url, post=True).post(url, **kwargs)
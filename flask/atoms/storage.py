@@ -1,13 +1,33 @@
-import os
+import os, threading, time, functools
+from concurrent.futures import ThreadPoolExecutor
 import mimetypes
 from dotenv import load_dotenv
 from google.cloud import storage
 from google.oauth2 import service_account
 from datetime import timedelta
-from google.api_core.exceptions import NotFound
+from google.api_core.exceptions import NotFound, Forbidden
 
 load_dotenv()
 
+BUCKET_CACHE_TTL = float(os.getenv("GCS_BUCKET_CACHE_TTL", 600))
+UPLOAD_CHUNK_SIZE = int(os.getenv("GCS_UPLOAD_CHUNK_SIZE", 1024 * 1024))  # multiple of 256 KiB
+SINGLE_UPLOAD_MAX = int(os.getenv("GCS_SINGLE_UPLOAD_MAX", 8 * 1024 * 1024))  # known sizes up to this go in one request
+DOWNLOAD_THREADS = int(os.getenv("GCS_DOWNLOAD_THREADS", 8))
+SIGNED_URL_MIN_REMAINING = float(os.getenv("GCS_SIGNED_URL_MIN_REMAINING", 0.5))  # reuse a URL while this fraction of the requested lifetime is left
+SIGNED_URL_CACHE_SIZE = int(os.getenv("GCS_SIGNED_URL_CACHE_SIZE", 10000))
+DOWNLOAD_RETRIES = int(os.getenv("GCS_DOWNLOAD_RETRIES", 3))
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+_bucket_cache = {}  # bucket_name -> (bucket, expires_at)
+_bucket_cache_pid = None
+_bucket_lock = threading.Lock()
+
+_signed_url_cache = {}  # (bucket_name, path, method, content_type) -> (url, expires_at)
+_signed_url_lock = threading.Lock()
+
 def init_google_credentials():
     return service_account.Credentials.from_service_account_info({
         "type": "service_account",
@@ -23,18 +43,99 @@ def init_google_credentials():
     })
 
 def get_client():
-    return storage.Client(credentials=init_google_credentials(), project=os.getenv("GOOGLE_PROJECT_ID"))
+    """Return the process-wide storage client, building credentials once per process."""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = storage.Client(credentials=init_google_credentials(), project=os.getenv("GOOGLE_PROJECT_ID"))
+            _client_pid = os.getpid()
+            with _bucket_lock:
+                _bucket_cache.clear()
+    return _client
+
+def _bucket_cache_for_pid():
+    # Caller holds _bucket_lock. Handles are bound to the creating process's
+    # client and HTTP session, so a forked worker (e.g. gunicorn preload) starts empty.
+    global _bucket_cache_pid
+    if _bucket_cache_pid != os.getpid():
+        _bucket_cache.clear()
+        _bucket_cache_pid = os.getpid()
+    return _bucket_cache
+
+def _cache_bucket(bucket):
+    with _bucket_lock:
+        _bucket_cache_for_pid()[bucket.name] = (bucket, time.monotonic() + BUCKET_CACHE_TTL)
+
+def _cached_bucket(bucket_name):
+    with _bucket_lock:
+        cache = _bucket_cache_for_pid()
+        entry = cache.get(bucket_name)
+        if entry is None:
+            return None
+        bucket, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del cache[bucket_name]
+            return None
+        return bucket
+
+def invalidate_bucket(org_id=None):
+    """Drop the cached bucket handle for one org, or for all orgs when org_id is None."""
+    with _bucket_lock:
+        if org_id is None:
+            _bucket_cache.clear()
+        else:
+            _bucket_cache.pop(f"o_{org_id}", None)
+
+def _drop_if_bucket_gone(bucket, error):
+    """
+    Forget a cached bucket when GCS says it no longer exists or is no longer
+    accessible, so the next get_bucket looks it up again instead of serving
+    a stale handle for the rest of BUCKET_CACHE_TTL. A missing object is also
+    a NotFound, but it says "No such object" and keeps the cache.
+    """
+    bucket_gone = isinstance(error, Forbidden) or (
+        isinstance(error, NotFound) and "bucket does not exist" in str(error).lower()
+    )
+    if bucket_gone and bucket is not None and bucket.name.startswith("o_"):
+        invalidate_bucket(bucket.name[len("o_"):])
+        print(f"♻️ Dropped cached bucket {bucket.name}: {error}")
+
+def _checks_bucket(func):
+    """Run _drop_if_bucket_gone on errors of storage helpers taking a bucket first."""
+    @functools.wraps(func)
+    def wrapper(bucket, *args, **kwargs):
+        try:
+            return func(bucket, *args, **kwargs)
+        except (NotFound, Forbidden) as e:
+            _drop_if_bucket_gone(getattr(bucket, "bucket", bucket), e)
+            raise
+    return wrapper
 
 def create_org_bucket(org_id):
     client = get_client()
     bucket_name = f"o_{org_id}"
-    if not client.lookup_bucket(bucket_name):
-        client.create_bucket(bucket_name)
+    bucket = client.lookup_bucket(bucket_name)
+    if not bucket:
+        bucket = client.create_bucket(bucket_name)
+    _cache_bucket(bucket)
     print(f"✅ Bucket created or verified: {bucket_name}")
 
 def get_bucket(org_id, logger=None):
+    """
+    Return the org bucket handle. The existence check (lookup_bucket) runs at
+    most once per GCS_BUCKET_CACHE_TTL seconds per org; cached hits make no
+    network calls.
+    """
+    return get_bucket_by_name(f"o_{org_id}", logger)
+
+def get_bucket_by_name(bucket_name, logger=None):
+    bucket = _cached_bucket(bucket_name)
+    if bucket is not None:
+        return bucket
+
     client = get_client()
-    bucket_name = f"o_{org_id}"
 
     try:
         bucket = client.lookup_bucket(bucket_name)
@@ -43,6 +144,7 @@ def get_bucket(org_id, logger=None):
             if logger: logger.error(msg)
             else: print(msg)
             return None
+        _cache_bucket(bucket)
         return bucket
     except NotFound:
         msg = f"❌ Bucket '{bucket_name}' not found (NotFound exception)."
@@ -55,16 +157,20 @@ def get_bucket(org_id, logger=None):
         else: print(msg)
         return None
 
+@_checks_bucket
 def blob_exists(bucket, path):
     return bucket.blob(path).exists()
 
+@_checks_bucket
 def create_empty_blob(bucket, path):
     bucket.blob(path).upload_from_string("")
 
+@_checks_bucket
 def upload_string(bucket, path, data, content_type="text/plain"):
     blob = bucket.blob(path)
     blob.upload_from_string(data, content_type=content_type)
 
+@_checks_bucket
 def upload_file_to_path(bucket, path, local_file_path):
     blob = bucket.blob(path)
     
@@ -78,22 +184,78 @@ def upload_file_to_path(bucket, path, local_file_path):
     blob.content_type = mime_type
     blob.upload_from_filename(local_file_path)
 
+@_checks_bucket
 def load_file_as_string(bucket, path):
     return bucket.blob(path).download_as_text()
 
+def load_file_as_bytes(bucket, path):
+    """Return the blob content, or None if it doesn't exist (one request either way)."""
+    try:
+        return bucket.blob(path).download_as_bytes()
+    except NotFound as e:
+        _drop_if_bucket_gone(bucket, e)
+        return None
+
+@_checks_bucket
 def delete_blob(bucket, path):
     blob = bucket.blob(path)
     blob.delete()
 
+@_checks_bucket
 def list_blobs(bucket, prefix):
     return list(bucket.list_blobs(prefix=prefix))
 
-def get_signed_url(bucket, path, expiration=3600, method="GET"):
-    blob = bucket.blob(path)
-    return blob.generate_signed_url(
-        expiration=timedelta(seconds=expiration),
-        method=method
-    )
+def get_signed_url(bucket, path, expiration=3600, method="GET", content_type=None):
+    """
+    Signed URL for a blob, reused from cache while it still has more than
+    SIGNED_URL_MIN_REMAINING of `expiration` seconds left. Signing is local,
+    with the credentials of the process-wide client.
+    """
+    return get_signed_urls(bucket, [path], expiration, method, content_type)[0]
+
+def get_signed_urls(bucket, paths, expiration=3600, method="GET", content_type=None):
+    """
+    Bulk variant of get_signed_url: one cache pass, then every missing URL is
+    signed in a row without further locking.
+
+    Returns:
+        list: URLs in the order of paths.
+    """
+    now = time.time()
+    min_left = expiration * SIGNED_URL_MIN_REMAINING
+    keys = [(bucket.name, path, method, content_type) for path in paths]
+    urls = [None] * len(keys)
+
+    with _signed_url_lock:
+        for i, key in enumerate(keys):
+            cached = _signed_url_cache.get(key)
+            if cached and cached[1] - now > min_left:
+                urls[i] = cached[0]
+
+    signed = {}
+    for i, key in enumerate(keys):
+        if urls[i] is None:
+            urls[i] = bucket.blob(key[1]).generate_signed_url(
+                expiration=timedelta(seconds=expiration),
+                method=method,
+                content_type=content_type
+            )
+            signed[key] = (urls[i], now + expiration)
+
+    if signed:
+        with _signed_url_lock:
+            if len(_signed_url_cache) + len(signed) > SIGNED_URL_CACHE_SIZE:
+                _prune_signed_urls(now)
+            _signed_url_cache.update(signed)
+    return urls
+
+def _prune_signed_urls(now):
+    # Drop expired URLs first, then the oldest half if that wasn't enough
+    for key in [k for k, (_, expires_at) in _signed_url_cache.items() if expires_at <= now]:
+        del _signed_url_cache[key]
+    if len(_signed_url_cache) > SIGNED_URL_CACHE_SIZE // 2:
+        for key in list(_signed_url_cache)[:len(_signed_url_cache) // 2]:
+            del _signed_url_cache[key]
 
 def get_file_signed_url(org_id, path, expiration=3600):
     bucket = get_bucket(org_id)
@@ -124,6 +286,7 @@ def get_last_attempt(org_id, interview_id, user_id):
 
     return max(attempt_nums) if attempt_nums else 0
 
+@_checks_bucket
 def upload_blob_from_bytes(bucket, path, data_bytes, content_type="application/octet-stream"):
     """
     Upload a binary blob (e.g., mp3) to GCS at the specified path.
@@ -137,6 +300,89 @@ def upload_blob_from_bytes(bucket, path, data_bytes, content_type="application/o
     blob = bucket.blob(path)
     blob.upload_from_string(data_bytes, content_type=content_type)
 
+@_checks_bucket
+def upload_stream(bucket, path, stream, content_type="application/octet-stream", md5=None, size=None):
+    """
+    Upload a file-like object to GCS.
+
+    With a known size up to SINGLE_UPLOAD_MAX the object goes in a single
+    request (read into memory once). Otherwise it is streamed as a resumable
+    upload, UPLOAD_CHUNK_SIZE bytes at a time: one session request plus one
+    PUT per chunk. A CRC32C of the sent bytes is checked against the one GCS
+    computes; on mismatch the library deletes the blob and raises DataCorruption.
+
+    Args:
+        bucket: GCS bucket object
+        path (str): Full path in the bucket
+        stream: Readable binary file-like object (e.g. a request stream)
+        content_type (str): MIME type (e.g., "video/webm")
+        md5 (str, optional): Base64 MD5 supplied by the client; GCS rejects the
+            upload if the stored object doesn't match it.
+        size (int, optional): Byte length of the stream, e.g. Content-Length.
+    """
+    if size is not None and size <= SINGLE_UPLOAD_MAX:
+        blob = bucket.blob(path)
+    else:
+        blob = bucket.blob(path, chunk_size=UPLOAD_CHUNK_SIZE)
+    if md5:
+        blob.md5_hash = md5
+    blob.upload_from_file(stream, size=size, content_type=content_type, checksum="crc32c")
+    return blob
+
+@_checks_bucket
+def download_blob(blob, local_path, retries=DOWNLOAD_RETRIES):
+    """
+    Download a blob, verifying it against the object's CRC32C (MD5 when only
+    that is known). Works on bare bucket.blob(path) handles too, the checksum
+    is compared with the hash GCS sends with the data. Corrupt or failed
+    transfers are retried with backoff; the file only appears at local_path
+    once it is complete.
+
+    Returns:
+        int: Bytes downloaded.
+    """
+    checksum = "md5" if blob.md5_hash and not blob.crc32c else "crc32c"
+    tmp_path = f"{local_path}.part"
+
+    for attempt in range(1, retries + 1):
+        try:
+            blob.download_to_filename(tmp_path, checksum=checksum)
+            os.replace(tmp_path, local_path)
+            return os.path.getsize(local_path)
+        except Exception as e:
+            if attempt == retries:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            print(f"⚠️ Download of {blob.name} failed (attempt {attempt}/{retries}): {e}")
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+def download_blobs(items, threads=DOWNLOAD_THREADS):
+    """
+    Download many blobs concurrently with download_blob.
+
+    Args:
+        items (list of tuples): (blob, local_path) pairs.
+
+    Returns:
+        dict: {local_path: bytes downloaded, or the exception that stopped it}
+    """
+    results = {}
+    if not items:
+        return results
+
+    def download(item):
+        blob, local_path = item
+        try:
+            return local_path, download_blob(blob, local_path)
+        except Exception as e:
+            return local_path, e
+
+    with ThreadPoolExecutor(max_workers=min(threads, len(items))) as pool:
+        for local_path, result in pool.map(download, items):
+            results[local_path] = result
+    return results
+
     
 # import os, mimetypes
 # from dotenv import load_dotenv
@@ -2,72 +2,135 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-import os, subprocess, re, json, ffmpeg
+import os, subprocess, re, json, shutil, threading, filecmp, ffmpeg
 
-def get_real_duration(path):
+PROBE_CACHE_SIZE = int(os.getenv("PROBE_CACHE_SIZE", 512))
+
+class MediaInfo:
+    """
+    Result of a single ffprobe pass over a media file.
+
+    -count_packets gives frame presence from the demuxer alone, so unlike
+    -count_frames nothing is decoded.
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.video_codec = None
+        self.audio_codec = None
+        self.fps = None
+        self.width = None
+        self.height = None
+        self.sample_rate = None
+        self.channels = None
+        self.video_packets = 0
+        self.audio_packets = 0
+        self.stream_duration = 0.0
+
+        for stream in data.get("streams", []):
+            if stream.get("codec_type") == "video" and self.video_codec is None:
+                self.video_codec = stream.get("codec_name")
+                self.fps = _parse_rate(stream.get("r_frame_rate"))
+                self.width = stream.get("width")
+                self.height = stream.get("height")
+                self.video_packets = _to_int(stream.get("nb_read_packets"))
+            elif stream.get("codec_type") == "audio" and self.audio_codec is None:
+                self.audio_codec = stream.get("codec_name")
+                self.sample_rate = _to_int(stream.get("sample_rate")) or None
+                self.channels = stream.get("channels")
+                self.audio_packets = _to_int(stream.get("nb_read_packets"))
+            self.stream_duration = max(self.stream_duration, _to_float(stream.get("duration")))
+
+        self.format_duration = _to_float(data.get("format", {}).get("duration"))
+
+    @property
+    def duration(self):
+        """Longest of the container and stream durations."""
+        return max(self.stream_duration, self.format_duration)
+
+    @property
+    def has_frames(self):
+        return self.video_packets > 0 or self.audio_packets > 0
+
+    @property
+    def stream_params(self):
+        """Parameters that must match for chunks to be joined with -c copy."""
+        return (self.video_codec, self.width, self.height, self.audio_codec, self.sample_rate, self.channels)
+
+def _parse_rate(rate):
     try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", path],
-            capture_output=True, text=True
-        )
-        return float(result.stdout.strip())
-    except:
+        num, den = (rate or "0/1").split("/")
+        return float(num) / float(den) if float(den) else None
+    except ValueError:
+        return None
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
         return 0.0
 
-def has_frames(path):
-    def get_nb_read_frames(stream_type):
-        try:
-            result = subprocess.run([
-                "ffprobe", "-v", "error",
-                "-count_frames",
-                "-select_streams", stream_type,
-                "-show_entries", "stream=nb_read_frames",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                path
-            ], capture_output=True, text=True)
-            return int(result.stdout.strip())
-        except:
-            return 0
-
-    return get_nb_read_frames("v:0") > 0 or get_nb_read_frames("a:0") > 0
+_probe_cache = {}
+_probe_lock = threading.Lock()
+
+def probe(path):
+    """
+    Return the MediaInfo for path, memoized by path + mtime + size so a
+    rewritten file is probed again.
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    with _probe_lock:
+        cached = _probe_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
 
-def needs_fixing(path, VALID_VIDEO={"vp8", "vp9", "av1"}, VALID_AUDIO={"opus", "vorbis"}, CHUNK_DURATION=15):
     result = subprocess.run([
-        "ffprobe", "-v", "error", "-show_streams", "-show_format", "-of", "json", path
+        "ffprobe", "-v", "error", "-count_packets",
+        "-show_streams", "-show_format", "-of", "json", path
     ], capture_output=True, text=True)
 
-    info = json.loads(result.stdout)
-    video_codec = None
-    audio_codec = None
-    duration = 0
-    fps_valid = True
-
-    for stream in info.get("streams", []):
-        if stream["codec_type"] == "video":
-            video_codec = stream.get("codec_name")
-            try:
-                fps = eval(stream.get("r_frame_rate", "0/1"))
-                if fps < 10 or fps > 60:
-                    fps_valid = False
-            except:
-                fps_valid = False
-        elif stream["codec_type"] == "audio":
-            audio_codec = stream.get("codec_name")
-
-        try:
-            stream_duration = float(stream.get("duration", 0))
-            duration = max(duration, stream_duration)
-        except:
-            pass
+    try:
+        data = json.loads(result.stdout or "{}")
+    except ValueError:
+        data = {}
+    info = MediaInfo(path, data)
+
+    with _probe_lock:
+        _probe_cache.pop(path, None)
+        if len(_probe_cache) >= PROBE_CACHE_SIZE:
+            _probe_cache.pop(next(iter(_probe_cache)))
+        _probe_cache[path] = (key, info)
+    return info
 
+def get_real_duration(path):
+    try:
+        return probe(path).format_duration
+    except:
+        return 0.0
+
+def has_frames(path):
     try:
-        format_duration = float(info.get("format", {}).get("duration", 0))
-        duration = max(duration, format_duration)
+        return probe(path).has_frames
     except:
-        pass
+        return False
+
+def needs_fixing(path, VALID_VIDEO={"vp8", "vp9", "av1"}, VALID_AUDIO={"opus", "vorbis"}, CHUNK_DURATION=15):
+    info = probe(path)
+    video_codec = info.video_codec
+    audio_codec = info.audio_codec
+    duration = info.duration
+    fps_valid = info.fps is not None and 10 <= info.fps <= 60
 
     if duration < 0.2:
-        if has_frames(path):
+        if info.has_frames:
             print(f"⚠️  Zero-duration but has frames - reencoding: {path}")
             return True
         elif video_codec in VALID_VIDEO and audio_codec in VALID_AUDIO:
@@ -89,17 +152,123 @@ def needs_fixing(path, VALID_VIDEO={"vp8", "vp9", "av1"}, VALID_AUDIO={"opus", "
 
     return False
 
-def reencode_webm(src, dst):
-    subprocess.run([
-        "ffmpeg", "-y", "-i", src,
-        "-c:v", "libvpx", "-b:v", "1M",
-        "-c:a", "libopus",
-        dst
-    ], check=True)
+VIDEO_ENCODERS = {"vp8": "libvpx", "vp9": "libvpx-vp9"}
+
+def reencode_webm(src, dst, like=None):
+    """
+    Re-encode to VP8 + Opus. With like (a MediaInfo) the output copies its
+    codec, frame size and audio layout so it can be stream-copied next to it.
+    """
+    video = ["-c:v", "libvpx", "-b:v", "1M"]
+    audio = ["-c:a", "libopus"]
+    if like is not None:
+        video = ["-c:v", VIDEO_ENCODERS.get(like.video_codec, "libvpx"), "-b:v", "1M"]
+        if like.width and like.height:
+            video += ["-vf", f"scale={like.width}:{like.height}"]
+        if like.sample_rate:
+            audio += ["-ar", str(like.sample_rate)]
+        if like.channels:
+            audio += ["-ac", str(like.channels)]
+
+    subprocess.run(["ffmpeg", "-y", "-i", src] + video + audio + [dst], check=True)
+
+def normalize_chunk(src, dst, reuse=False):
+    """
+    Copy a chunk to dst, re-encoding it first if needs_fixing says so.
+    Picklable entry point for the process pool.
+
+    Args:
+        reuse (bool): Keep an existing dst (e.g. normalized during incremental
+            processing). Only pass it when dst is known to come from the same
+            attempt as src; otherwise dst is rebuilt.
+
+    Returns:
+        tuple: (re-encoded?, MediaInfo of dst), or None if the chunk is unusable.
+    """
+    if reuse and os.path.exists(dst):
+        # A plain copy has the source's bytes; anything else was re-encoded
+        return not filecmp.cmp(src, dst, shallow=False), probe(dst)
+
+    fix_required = needs_fixing(src)
+    if fix_required is None:
+        return None
+
+    # Write under a temp name so an interrupted run never leaves a partial dst
+    tmp = _tmp_output(dst)
+    if fix_required:
+        reencode_webm(src, tmp)
+        os.replace(tmp, dst)
+        return True, probe(dst)
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    # Same bytes as the source, so its probe still applies
+    return False, probe(src)
+
+def concat_copy(paths, output_path):
+    """
+    Join chunks with the concat demuxer without re-encoding.
+    All inputs must share MediaInfo.stream_params.
+
+    Returns:
+        bool: True on success, False if ffmpeg rejected the inputs.
+    """
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w") as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    tmp_path = _tmp_output(output_path)
+    result = subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-c", "copy", tmp_path
+    ], capture_output=True, text=True)
+    os.remove(list_path)
+
+    if result.returncode != 0:
+        print(f"⚠️ Stream-copy concat failed: {result.stderr.strip()[-500:]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, output_path)
+    return True
+
+def concat_reencode(paths, output_path):
+    """Join chunks through the concat filter, re-encoding to VP8 + Opus."""
+    inputs = []
+    filters = []
+    for i, path in enumerate(paths):
+        inputs.extend(["-i", path])
+        filters.append(f"[{i}:v:0][{i}:a:0]")
+
+    filter_concat = ''.join(filters) + f"concat=n={len(filters)}:v=1:a=1[outv][outa]"
+
+    tmp_path = _tmp_output(output_path)
+    try:
+        subprocess.run(["ffmpeg", "-y"] + inputs + [
+            "-filter_complex", filter_concat,
+            "-map", "[outv]", "-map", "[outa]",
+            "-c:v", "libvpx", "-b:v", "1M", "-c:a", "libopus",
+            tmp_path
+        ], check=True)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+
+def _tmp_output(path):
+    # Keep the extension last so ffmpeg still picks the container from it
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp{ext}"
+
+CHUNK_FILE_RE = re.compile(r"^\d+_\d+\.webm$")
 
 def sort_webm_files(user_id):
+    # Only <question>_<chunk>.webm: the built interview.webm and temp files live here too
     directory = f"temp/{user_id}"
-    webm_files = [f for f in os.listdir(directory) if f.endswith(".webm")]
+    webm_files = [f for f in os.listdir(directory) if CHUNK_FILE_RE.match(f)]
     return sorted(webm_files, key=sorting_key)
 
 def sorting_key(filename):
@@ -122,3 +291,29 @@ def convert_webm_to_wav(input_path, output_path=None):
         return output_path
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"FFmpeg conversion failed: {e}")
+
+def decode_to_pcm(input_path, sample_rate=16000):
+    """Decode the audio track to raw mono 16-bit PCM in memory, no wav on disk."""
+    try:
+        result = subprocess.run([
+            "ffmpeg", "-v", "error", "-i", input_path,
+            "-vn", "-ac", "1", "-ar", str(sample_rate),
+            "-f", "s16le", "pipe:1"
+        ], capture_output=True, check=True)
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"FFmpeg decode failed: {e}")
+
+def extract_audio_webm(input_path):
+    """
+    Return the audio track of a webm chunk as an audio-only webm in memory.
+    Opus is stream-copied (no decode); anything else is re-encoded to opus.
+    """
+    for codec in (["-c:a", "copy"], ["-c:a", "libopus", "-b:a", "48k"]):
+        result = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", input_path, "-vn"] + codec + ["-f", "webm", "pipe:1"],
+            capture_output=True
+        )
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+    raise RuntimeError(f"FFmpeg audio extraction failed for {input_path}")
@@ -28,16 +28,42 @@ from .questions import (
     get_questions,
     get_questions_expected,
     get_question_audio_url,
-    get_latest_attempt_number,
-    wait_for_attempt_ready,
+    get_question_audio_urls,
+)
+
+# attempts
+from .attempts import (
+    allocate_attempt,
+    get_latest_attempt,
+    record_chunk,
+    get_attempt_chunks,
+)
+
+# answers
+from .answers import (
+    save_chunk,
+    get_chunk_upload_urls,
+    confirm_chunk,
+)
+
+from .chunk_results import (
+    save_chunk_result,
+    get_chunk_results,
+)
+
+from .checkpoints import (
+    save_checkpoint,
+    get_checkpoints,
 )
 
 from .process import (
     download_attempt_files,
+    process_uploaded_chunk,
     generate_transcription,
     rate_answer_set,
     build_video,
     upload_interview,
+    upload_interview_video,
     summarize_cost,
     insert_interview_cost,
 )
@@ -51,9 +77,20 @@ from .organizations import (
 from .gen_interview import (
     generate_interview_from_text,
     detect_language,
-    record_interview_questions,
     prepare_interview_folder,
-    upload_interview_audio,
+    record_and_upload_questions,
+    get_recorded_question_nums,
+)
+
+from .jobs import (
+    enqueue_job,
+    claim_job,
+    complete_job,
+    fail_job,
+    defer_job,
+    count_attempt_jobs,
+    requeue_stale_jobs,
+    get_jobs_for_org,
 )
 
 from .billing import (
@@ -89,15 +126,35 @@ __all__ = [
     "get_questions",
     "get_questions_expected",
     "get_question_audio_url",
-    "get_latest_attempt_number",
-    "wait_for_attempt_ready",
+    "get_question_audio_urls",
+
+    # Attempts
+    "allocate_attempt",
+    "get_latest_attempt",
+    "record_chunk",
+    "get_attempt_chunks",
+
+    # Answers
+    "save_chunk",
+    "get_chunk_upload_urls",
+    "confirm_chunk",
+
+    # Chunk results
+    "save_chunk_result",
+    "get_chunk_results",
+
+    # Checkpoints
+    "save_checkpoint",
+    "get_checkpoints",
 
     # Process
     "download_attempt_files",
+    "process_uploaded_chunk",
     "generate_transcription",
     "rate_answer_set",
     "build_video",
     "upload_interview",
+    "upload_interview_video",
     "summarize_cost",
     "insert_interview_cost",
 
@@ -109,9 +166,19 @@ __all__ = [
     # Gen Interview
     "generate_interview_from_text",
     "detect_language",
-    "record_interview_questions",
     "prepare_interview_folder",
-    "upload_interview_audio",
+    "record_and_upload_questions",
+    "get_recorded_question_nums",
+
+    # Jobs
+    "enqueue_job",
+    "claim_job",
+    "complete_job",
+    "fail_job",
+    "defer_job",
+    "count_attempt_jobs",
+    "requeue_stale_jobs",
+    "get_jobs_for_org",
 
     # Billing
     "init_organization_billing",
@@ -1,22 +1,39 @@
-from atoms import get_bucket, upload_file_to_path
-import tempfile
-import os
+from atoms import get_bucket, upload_stream, get_signed_urls
+from .attempts import record_chunk
 
-def save_chunk(org_id, interview_id, uuid, attempt, question_num, chunk_index, file_storage):
+def chunk_path(interview_id, uuid, attempt, question_num, chunk_index):
+    # GCS path: o_<org_id>/<interview_id>/respondents/<uuid>/attempt_<n>/<q>_<chunk>.webm
+    return f"{interview_id}/respondents/{uuid}/attempt_{attempt}/{question_num}_{chunk_index}.webm"
+
+def save_chunk(org_id, interview_id, uuid, attempt, question_num, chunk_index, stream, md5=None, size=None):
     bucket = get_bucket(org_id)
+    gcs_path = chunk_path(interview_id, uuid, attempt, question_num, chunk_index)
 
-    # Build GCS path: o_<org_id>/<interview_id>/respondents/<uuid>/attempt_<n>/<q>_<chunk>.webm
-    gcs_path = f"{interview_id}/respondents/{uuid}/attempt_{attempt}/{question_num}_{chunk_index}.webm"
+    # Chunks of a known, small size go in one request; see upload_stream
+    blob = upload_stream(bucket, gcs_path, stream, content_type="video/webm", md5=md5, size=size)
+    record_chunk(interview_id, uuid, attempt, question_num, chunk_index, blob.size)
 
-    # Save file to a temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        file_storage.save(tmp.name)
-        local_file_path = tmp.name
+    return True
 
-    # Upload to GCS
-    upload_file_to_path(bucket, gcs_path, local_file_path)
+def get_chunk_upload_urls(org_id, interview_id, uuid, attempt, question_nums, chunks, expiration=3600):
+    """
+    Pre-sign PUT URLs so the browser can upload chunks straight to GCS.
 
-    # Cleanup
-    os.remove(local_file_path)
+    The client must send `Content-Type: video/webm`, it is part of the signature.
 
+    Returns:
+        list of lists: urls[i][c] is the URL for chunk c of question_nums[i].
+    """
+    bucket = get_bucket(org_id)
+    paths = [chunk_path(interview_id, uuid, attempt, q, c) for q in question_nums for c in range(chunks)]
+    urls = get_signed_urls(bucket, paths, expiration, method="PUT", content_type="video/webm")
+    return [urls[i * chunks:(i + 1) * chunks] for i in range(len(question_nums))]
+
+def confirm_chunk(org_id, interview_id, uuid, attempt, question_num, chunk_index):
+    """Check that a directly uploaded chunk actually landed in GCS and add it to the manifest."""
+    bucket = get_bucket(org_id)
+    blob = bucket.get_blob(chunk_path(interview_id, uuid, attempt, question_num, chunk_index))
+    if blob is None:
+        return False
+    record_chunk(interview_id, uuid, attempt, question_num, chunk_index, blob.size)
     return True
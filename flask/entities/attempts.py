@@ -0,0 +1,102 @@
+from atoms import run_query, transaction, get_last_attempt
+
+def allocate_attempt(org_id, interview_id, uuid, new_respondent=False):
+    """
+    Atomically reserve the next attempt number for a respondent.
+
+    Concurrent calls for the same respondent serialize on an advisory lock.
+    Respondents recorded before the manifest existed are seeded once from a
+    GCS listing so their old attempt folders are never reused; the listing
+    runs before the lock is taken and is skipped for new respondents.
+
+    Args:
+        new_respondent (bool): The respondent was just created and has no attempts yet.
+
+    Returns:
+        int: The new attempt number.
+    """
+    seed = 0
+    if not new_respondent and _manifest_last_attempt(interview_id, uuid) is None:
+        seed = get_last_attempt(org_id, interview_id, uuid)
+
+    with transaction():
+        run_query("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", (int(interview_id), uuid))
+        last = _manifest_last_attempt(interview_id, uuid)
+        if last is None:
+            last = seed
+
+        attempt = last + 1
+        run_query(
+            """
+            INSERT INTO respondent_attempts (interview_id, respondent_hash, attempt)
+            VALUES (%s, %s, %s)
+            """,
+            (interview_id, uuid, attempt)
+        )
+    return attempt
+
+def get_latest_attempt(org_id, interview_id, uuid):
+    """
+    Highest attempt number of a respondent, from the manifest (GCS listing
+    only for respondents that predate it).
+
+    Returns:
+        int: Attempt number, 0 if there are none.
+    """
+    last = _manifest_last_attempt(interview_id, uuid)
+    if last is None:
+        return get_last_attempt(org_id, interview_id, uuid)
+    return last
+
+def _manifest_last_attempt(interview_id, uuid):
+    row = run_query(
+        """
+        SELECT MAX(attempt) AS attempt FROM respondent_attempts
+        WHERE interview_id = %s AND respondent_hash = %s
+        """,
+        (interview_id, uuid),
+        fetch_one=True
+    )
+    return row["attempt"] if row else None
+
+def record_chunk(interview_id, uuid, attempt, question_num, chunk_index, size_bytes=None):
+    """Add an uploaded chunk to the attempt manifest (re-uploads overwrite)."""
+    run_query(
+        """
+        INSERT INTO attempt_chunks (interview_id, respondent_hash, attempt, question_num, chunk_index, size_bytes)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (interview_id, respondent_hash, attempt, question_num, chunk_index)
+        DO UPDATE SET size_bytes = EXCLUDED.size_bytes, uploaded_at = CURRENT_TIMESTAMP
+        """,
+        (interview_id, uuid, attempt, question_num, chunk_index, size_bytes)
+    )
+
+def get_attempt_chunks(interview_id, uuid, attempt):
+    """
+    List the chunks recorded for an attempt.
+
+    Returns:
+        list of dicts or None: Each with question_num, chunk_index and size_bytes,
+        in order. None if the attempt was allocated before the manifest existed,
+        its chunk rows would be incomplete.
+    """
+    allocated = run_query(
+        """
+        SELECT 1 FROM respondent_attempts
+        WHERE interview_id = %s AND respondent_hash = %s AND attempt = %s
+        """,
+        (interview_id, uuid, attempt),
+        fetch_one=True
+    )
+    if not allocated:
+        return None
+
+    return run_query(
+        """
+        SELECT question_num, chunk_index, size_bytes FROM attempt_chunks
+        WHERE interview_id = %s AND respondent_hash = %s AND attempt = %s
+        ORDER BY question_num, chunk_index
+        """,
+        (interview_id, uuid, attempt),
+        fetch_all=True
+    )
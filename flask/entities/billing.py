@@ -1,5 +1,5 @@
 import os
-from atoms import run_query
+from atoms import run_query, transaction
 from decimal import Decimal
 from dotenv import load_dotenv
 
@@ -21,6 +21,7 @@ def init_organization_billing(org_id: int):
     )
 
 def get_balance(org_id: int):
+    # The row lock only holds when called inside a transaction() block
     row = run_query(
         "SELECT cash_balance FROM billing_accounts WHERE org_id = %s FOR UPDATE",
         (org_id,),
@@ -59,21 +60,22 @@ def add_payment(org_id: int, amount, method: str = "manual", reference: str = ""
     if amount == 0:
         raise ValueError("Payment amount cannot be zero")
     
-    # Increase balance
-    run_query(
-        """
-        UPDATE billing_accounts
-        SET cash_balance = cash_balance + %s
-        WHERE org_id = %s
-        """,
-        (amount, org_id)
-    )
+    with transaction():
+        # Increase balance
+        run_query(
+            """
+            UPDATE billing_accounts
+            SET cash_balance = cash_balance + %s
+            WHERE org_id = %s
+            """,
+            (amount, org_id)
+        )
 
-    # Log payment
-    run_query(
-        """
-        INSERT INTO organization_payments (org_id, amount, method, reference)
-        VALUES (%s, %s, %s, %s)
-        """,
-        (org_id, amount, method, reference)
-    )
+        # Log payment
+        run_query(
+            """
+            INSERT INTO organization_payments (org_id, amount, method, reference)
+            VALUES (%s, %s, %s, %s)
+            """,
+            (org_id, amount, method, reference)
+        )
@@ -0,0 +1,40 @@
+import json
+from atoms import run_query
+
+def save_checkpoint(interview_id, uuid, attempt, stage, data):
+    """
+    Store the output of a finished processing stage so a re-run can skip it.
+
+    Args:
+        stage (str): Stage name, e.g. 'transcription', 'rating', 'video'.
+        data (dict): JSON-serializable stage output.
+
+    Returns:
+        None
+    """
+    run_query(
+        """
+        INSERT INTO process_checkpoints (interview_id, respondent_hash, attempt, stage, data)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (interview_id, respondent_hash, attempt, stage)
+        DO UPDATE SET data = EXCLUDED.data, created_at = CURRENT_TIMESTAMP
+        """,
+        (interview_id, uuid, attempt, stage, json.dumps(data))
+    )
+
+def get_checkpoints(interview_id, uuid, attempt):
+    """
+    Fetch the completed stages of an attempt.
+
+    Returns:
+        dict: {stage: data}
+    """
+    rows = run_query(
+        """
+        SELECT stage, data FROM process_checkpoints
+        WHERE interview_id = %s AND respondent_hash = %s AND attempt = %s
+        """,
+        (interview_id, uuid, attempt),
+        fetch_all=True
+    )
+    return {row["stage"]: row["data"] for row in rows}
@@ -0,0 +1,47 @@
+from atoms import run_query
+
+def save_chunk_result(interview_id, uuid, attempt, question_num, chunk_index, status, transcript=None, stt_price=0.0, stt_duration=0.0, reencoded=False):
+    """
+    Persist the outcome of incremental processing for one chunk.
+
+    Args:
+        status (str): 'done', 'silent' (skipped by VAD) or 'failed' (Deepgram error).
+        reencoded (bool): A normalized copy was uploaded under attempt_<n>/fixed/.
+
+    Returns:
+        None
+    """
+    run_query(
+        """
+        INSERT INTO chunk_results (
+            interview_id, respondent_hash, attempt, question_num, chunk_index,
+            status, transcript, stt_price, stt_duration_sec, reencoded
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (interview_id, respondent_hash, attempt, question_num, chunk_index)
+        DO UPDATE SET
+            status = EXCLUDED.status,
+            transcript = EXCLUDED.transcript,
+            stt_price = EXCLUDED.stt_price,
+            stt_duration_sec = EXCLUDED.stt_duration_sec,
+            reencoded = EXCLUDED.reencoded,
+            created_at = CURRENT_TIMESTAMP
+        """,
+        (interview_id, uuid, attempt, question_num, chunk_index, status, transcript, stt_price, stt_duration, reencoded)
+    )
+
+def get_chunk_results(interview_id, uuid, attempt):
+    """
+    Fetch every stored chunk result of an attempt.
+
+    Returns:
+        dict: {(question_num, chunk_index): row}
+    """
+    rows = run_query(
+        """
+        SELECT * FROM chunk_results
+        WHERE interview_id = %s AND respondent_hash = %s AND attempt = %s
+        """,
+        (interview_id, uuid, attempt),
+        fetch_all=True
+    )
+    return {(row["question_num"], row["chunk_index"]): row for row in rows}
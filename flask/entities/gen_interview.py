@@ -1,15 +1,28 @@
-import json, re
+import json, re, os, uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
 from atoms import (
     init_openai, 
     respond_with_ai,
     synthesize_voice,
+    tts_cache_key,
     create_org_bucket,
     get_bucket,
+    get_bucket_by_name,
     create_empty_blob,
     upload_blob_from_bytes,
+    load_file_as_bytes,
+    list_blobs,
     blob_exists
 )
 
+load_dotenv()
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "/tmp/tts-cache")  # outside the /src source mount
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", 500))  # least recently used clips are evicted above this
+TTS_CACHE_BUCKET = os.getenv("TTS_CACHE_BUCKET")  # optional bucket shared by all workers
+TTS_THREADS = int(os.getenv("TTS_THREADS", 3))  # concurrent ElevenLabs requests per build
+
 def generate_interview_from_text(raw_text):
     openai_client = init_openai()
     lang = detect_language(raw_text, openai_client)
@@ -89,17 +102,66 @@ def extract_json_block(text):
         return match.group(0)
     raise ValueError("No JSON block found in GPT response")
 
-def record_interview_questions(questions):
-    audio_blobs = []
+def synthesize_voice_cached(text):
+    """
+    Return question audio from the content-addressed TTS cache, synthesizing
+    only on a miss. Lookup order: local disk, TTS_CACHE_BUCKET, ElevenLabs.
+    """
+    key = tts_cache_key(text)
+    local_path = os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
 
-    for i, q in enumerate(questions):
+    try:
+        with open(local_path, "rb") as f:
+            audio = f.read()
+        os.utime(local_path)  # mark as recently used for eviction
+        return audio
+    except FileNotFoundError:
+        pass
+
+    bucket = get_bucket_by_name(TTS_CACHE_BUCKET) if TTS_CACHE_BUCKET else None
+    remote_path = f"tts/{key}.mp3"
+
+    audio = load_file_as_bytes(bucket, remote_path) if bucket else None
+    if audio is None:
+        audio = synthesize_voice(text)
+        if bucket:
+            upload_blob_from_bytes(bucket, remote_path, audio, content_type="audio/mpeg")
+    else:
+        print(f"♻️ TTS cache hit: {key}")
+
+    _write_local_cache(local_path, audio)
+    return audio
+
+def _write_local_cache(local_path, audio):
+    # Write-then-rename so concurrent builds never read a half-written clip
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    tmp_path = f"{local_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(audio)
+    os.replace(tmp_path, local_path)
+    _trim_local_cache()
+
+def _trim_local_cache():
+    """Delete least recently used clips until the local cache fits in TTS_CACHE_MAX_MB."""
+    entries = []
+    for entry in os.scandir(TTS_CACHE_DIR):
+        if entry.name.endswith(".mp3"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    limit = TTS_CACHE_MAX_MB * 1024 * 1024
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
         try:
-            audio = synthesize_voice(q["question"])
-            audio_blobs.append((i, audio))  # use index, not id
-        except Exception as e:
-            print(f"❌ Failed to synthesize question {i}: {e}")
-
-    return audio_blobs
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
 
 def prepare_interview_folder(org_id, interview_id):
     create_org_bucket(org_id)
@@ -107,16 +169,55 @@ def prepare_interview_folder(org_id, interview_id):
     create_empty_blob(bucket, f"{interview_id}/questions/.ready")
     create_empty_blob(bucket, f"{interview_id}/respondents/.ready")
 
-def upload_interview_audio(org_id, interview_id, blobs):
+def get_recorded_question_nums(org_id, interview_id):
+    """Return indexes of questions whose audio is already in GCS."""
+    bucket = get_bucket(org_id)
+    prefix = f"{interview_id}/questions/"
+    recorded = set()
+    for blob in list_blobs(bucket, prefix):
+        name = blob.name[len(prefix):]
+        if name.endswith(".mp3") and name[:-4].isdigit():
+            recorded.add(int(name[:-4]))
+    return recorded
+
+def record_and_upload_questions(org_id, interview_id, questions, skip=()):
+    """
+    Synthesize questions on TTS_THREADS threads and upload each clip as soon
+    as it is ready, so at most TTS_THREADS clips are held in memory.
+
+    Args:
+        questions (list of dicts): Each with a "question" text, in index order.
+        skip (iterable): Indexes already recorded (resumed builds).
+
+    Returns:
+        dict: {index: "done" | "skipped" | "failed"}
+    """
     bucket = get_bucket(org_id)
     ready_marker = f"{interview_id}/questions/.ready"
 
     if not blob_exists(bucket, ready_marker):
         raise RuntimeError(f"❌ Cannot upload audio: {ready_marker} marker not found.")
 
-    for idx, blob in blobs:
-        path = f"{interview_id}/questions/{idx}.mp3"
-        upload_blob_from_bytes(bucket, path, blob, content_type="audio/mpeg")
-        print(f"✅ Uploaded question {idx}")
-
-
+    def record(idx, text):
+        audio = synthesize_voice_cached(text)
+        upload_blob_from_bytes(bucket, f"{interview_id}/questions/{idx}.mp3", audio, content_type="audio/mpeg")
+
+    status = {i: "skipped" for i in range(len(questions)) if i in set(skip)}
+
+    with ThreadPoolExecutor(max_workers=TTS_THREADS) as pool:
+        futures = {
+            pool.submit(record, i, q["question"]): i
+            for i, q in enumerate(questions)
+            if i not in status
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                future.result()
+                status[idx] = "done"
+                print(f"✅ Uploaded question {idx}")
+            except Exception as e:
+                status[idx] = "failed"
+                print(f"❌ Failed to record question {idx}: {e}")
+
+    return dict(sorted(status.items()))
@@ -1,4 +1,4 @@
-from atoms import run_query, get_bucket, get_signed_url
+from atoms import run_query, transaction, get_bucket, get_signed_url
 
 def get_interviews_for_org(org_id):
     sql = """
@@ -103,22 +103,23 @@ def create_interview_with_questions(
         video_required, visible
     )
 
-    interview = run_query(insert_interview_query, interview_params, fetch_one=True)
-    interview_id = interview['id']
+    with transaction():
+        interview = run_query(insert_interview_query, interview_params, fetch_one=True)
+        interview_id = interview['id']
 
-    if question_list:
-        values = ', '.join(["(%s, %s, %s, %s)"] * len(question_list))
-        flat_params = []
-        for q in question_list:
-            flat_params.extend([interview_id, q[0], q[1], q[2]])
+        if question_list:
+            values = ', '.join(["(%s, %s, %s, %s)"] * len(question_list))
+            flat_params = []
+            for q in question_list:
+                flat_params.extend([interview_id, q[0], q[1], q[2]])
 
-        run_query(
-            f"""
-            INSERT INTO questions (interview_id, question_num, question, expected)
-            VALUES {values}
-            """,
-            tuple(flat_params)
-        )
+            run_query(
+                f"""
+                INSERT INTO questions (interview_id, question_num, question, expected)
+                VALUES {values}
+                """,
+                tuple(flat_params)
+            )
 
     return interview_id
 
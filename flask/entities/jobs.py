@@ -0,0 +1,179 @@
+import json
+from atoms import run_query
+
+def enqueue_job(kind, payload, org_id=None, delay_sec=0, max_attempts=3):
+    """
+    Add a job to the durable queue.
+
+    Args:
+        kind (str): Handler name, e.g. 'process_interview'.
+        payload (dict): JSON-serializable handler arguments.
+        org_id (int, optional): Owning organization, used for visibility.
+        delay_sec (float): Don't run before NOW() + delay_sec.
+        max_attempts (int): Runs allowed before the job is marked failed.
+
+    Returns:
+        int: Job ID.
+    """
+    row = run_query(
+        """
+        INSERT INTO jobs (kind, payload, org_id, max_attempts, run_after)
+        VALUES (%s, %s, %s, %s, NOW() + make_interval(secs => %s))
+        RETURNING id
+        """,
+        (kind, json.dumps(payload), org_id, max_attempts, delay_sec),
+        fetch_one=True
+    )
+    return row["id"]
+
+def claim_job(worker_id, kinds=None):
+    """
+    Atomically take the oldest runnable job. Concurrent workers never get the
+    same row thanks to FOR UPDATE SKIP LOCKED.
+
+    Returns:
+        dict or None: Claimed job row, plus age_sec (seconds since it was enqueued).
+    """
+    kind_filter = "AND kind = ANY(%s)" if kinds else ""
+    params = (worker_id, list(kinds)) if kinds else (worker_id,)
+    return run_query(
+        f"""
+        UPDATE jobs SET
+            status = 'running',
+            attempts = attempts + 1,
+            locked_at = NOW(),
+            updated_at = NOW(),
+            locked_by = %s
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE status = 'queued' AND run_after <= NOW() {kind_filter}
+            ORDER BY run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING *, EXTRACT(EPOCH FROM NOW() - created_at) AS age_sec
+        """,
+        params,
+        fetch_one=True
+    )
+
+def complete_job(job_id):
+    run_query(
+        """
+        UPDATE jobs SET status = 'done', locked_by = NULL, updated_at = NOW()
+        WHERE id = %s
+        """,
+        (job_id,)
+    )
+
+def fail_job(job, error, backoff_sec=60):
+    """
+    Record a failed run. The job is re-queued with exponential backoff
+    (backoff_sec * 2^(attempts-1)) until max_attempts is reached, then marked failed.
+    """
+    retry = job["attempts"] < job["max_attempts"]
+    delay = backoff_sec * (2 ** (job["attempts"] - 1))
+    run_query(
+        """
+        UPDATE jobs SET
+            status = %s,
+            run_after = NOW() + make_interval(secs => %s),
+            last_error = %s,
+            locked_by = NULL,
+            updated_at = NOW()
+        WHERE id = %s
+        """,
+        ("queued" if retry else "failed", delay if retry else 0, str(error)[:2000], job["id"])
+    )
+    return retry
+
+def defer_job(job, delay_sec):
+    """Put a claimed job back without counting the run as an attempt."""
+    run_query(
+        """
+        UPDATE jobs SET
+            status = 'queued',
+            attempts = attempts - 1,
+            run_after = NOW() + make_interval(secs => %s),
+            locked_by = NULL,
+            updated_at = NOW()
+        WHERE id = %s
+        """,
+        (delay_sec, job["id"])
+    )
+
+def count_attempt_jobs(kind, interview_id, user_id, attempt, statuses=("queued", "running")):
+    """
+    Count jobs of one kind for a respondent attempt (matched on payload
+    interview_id, user_id and attempt).
+
+    Returns:
+        int: Number of matching jobs.
+    """
+    row = run_query(
+        """
+        SELECT COUNT(*) AS n FROM jobs
+        WHERE kind = %s AND status = ANY(%s)
+          AND payload->>'interview_id' = %s
+          AND payload->>'user_id' = %s
+          AND payload->>'attempt' = %s
+        """,
+        (kind, list(statuses), str(interview_id), str(user_id), str(attempt)),
+        fetch_one=True
+    )
+    return row["n"]
+
+def requeue_stale_jobs(timeout_sec):
+    """
+    Put back jobs whose worker died mid-run (still 'running' after timeout_sec).
+
+    Returns:
+        int: Number of jobs re-queued.
+    """
+    rows = run_query(
+        """
+        UPDATE jobs SET
+            status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            last_error = 'Worker timed out',
+            locked_by = NULL,
+            updated_at = NOW()
+        WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => %s)
+        RETURNING id
+        """,
+        (timeout_sec,),
+        fetch_all=True
+    )
+    return len(rows)
+
+def get_jobs_for_org(org_id, limit=50):
+    """
+    Return the most recent jobs of an organization and per-status counts.
+
+    Returns:
+        dict: {"counts": {status: n}, "jobs": [job dicts]}
+    """
+    counts = run_query(
+        """
+        SELECT status, COUNT(*) AS n FROM jobs
+        WHERE org_id = %s
+        GROUP BY status
+        """,
+        (org_id,),
+        fetch_all=True
+    )
+    jobs = run_query(
+        """
+        SELECT id, kind, payload, status, attempts, max_attempts,
+               last_error, created_at, updated_at
+        FROM jobs
+        WHERE org_id = %s
+        ORDER BY id DESC
+        LIMIT %s
+        """,
+        (org_id, limit),
+        fetch_all=True
+    )
+    return {
+        "counts": {r["status"]: r["n"] for r in counts},
+        "jobs": jobs
+    }
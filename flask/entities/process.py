@@ -1,24 +1,43 @@
-import os, re, subprocess, json
-from collections import defaultdict
+import os, re, json, shutil, time
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from .respondents import update_respondent_status
+from .answers import chunk_path
+from .chunk_results import save_chunk_result
+from .attempts import get_latest_attempt, get_attempt_chunks, record_chunk
+from utils.executors import get_process_pool, run_bounded, job_share
 from atoms import (
     get_bucket, 
     list_blobs, 
-    get_last_attempt, 
-    init_whisper,
-    convert_webm_to_wav, 
+    download_blobs,
     deepgram_transcribe,
     silence_prob, 
+    prepare_chunk_audio,
+    trim_to_speech,
+    trim_pcm_to_speech,
+    pcm_to_samples,
+    extract_audio_webm,
+    VAD_SAMPLE_RATE,
+    VAD_SILENT_BELOW,
+    VAD_CONFIRM_BELOW,
+    VAD_TRIM_SILENCE,
     init_openai, 
     respond_with_ai, 
-    get_real_duration,
-    needs_fixing,
     reencode_webm,
+    normalize_chunk,
+    concat_copy,
+    concat_reencode,
     sort_webm_files,
     run_query,
     upload_file_to_path
 )
 
+TRANSCRIBE_THREADS = int(os.getenv("TRANSCRIBE_THREADS", 8))  # concurrent Deepgram requests per job
+DEEPGRAM_AUDIO_SOURCE = os.getenv("DEEPGRAM_AUDIO_SOURCE", "webm")  # webm: in-memory audio, wav: legacy temp files
+RATE_MODE = os.getenv("RATE_MODE", "batched")  # batched | parallel | per_item
+RATE_THREADS = int(os.getenv("RATE_THREADS", 4))
+VIDEO_CONCAT_COPY = os.getenv("VIDEO_CONCAT_COPY", "true").lower() == "true"  # join chunks with -c copy when codecs match
+
 def download_attempt_files(org_id, interview_id, user_id, attempt, logger):
     try:
         bucket = get_bucket(org_id, logger)
@@ -27,29 +46,55 @@ def download_attempt_files(org_id, interview_id, user_id, attempt, logger):
             return []
 
         if not attempt:
-            attempt = get_last_attempt(org_id, interview_id, user_id)
+            attempt = get_latest_attempt(org_id, interview_id, user_id)
             logger.info(f"🔁 No attempt provided, using last found attempt: {attempt}")
             if attempt == 0:
                 logger.error("❌ No attempts found for respondent.")
                 return []
-        
-        prefix = f"{interview_id}/respondents/{user_id}/attempt_{attempt}"
-        blobs = list_blobs(bucket, prefix)
 
-        if not blobs:
+        entries = _attempt_blobs(bucket, interview_id, user_id, int(attempt), logger)
+        if not entries:
             logger.error(f"❌ No records for attempt {attempt} found for respondent {user_id}.")
             return []
 
         downloaded_files = []
         local_dir = f"temp/{user_id}"
+        _claim_work_dir(local_dir, int(attempt), logger)
+        fixed_dir = os.path.join(local_dir, "fixed")
+        os.makedirs(fixed_dir, exist_ok=True)
         logger.log_time(f"Ready for files downloading")
-        for blob in blobs:
-            if not blob.name.endswith(".webm"): continue
-            filename = blob.name.split("/")[-1]
+
+        pending = []
+        for blob, filename, fixed, size in entries:
+            if fixed:
+                # Normalized during incremental processing; build_video reuses it
+                local_path = os.path.join(fixed_dir, f"fixed_{filename}")
+                if not os.path.exists(local_path):
+                    pending.append((blob, local_path))
+                continue
             local_path = os.path.join(local_dir, filename)
-            blob.download_to_filename(local_path)
-            logger.log_time(f"✅ File {filename} has been downloaded to {local_dir}")
             downloaded_files.append(filename)
+            if size is not None and os.path.exists(local_path) and os.path.getsize(local_path) == size:
+                # Left over from an earlier run of this attempt
+                continue
+            pending.append((blob, local_path))
+
+        started = time.monotonic()
+        results = download_blobs(pending)
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        failed = [path for path, result in results.items() if isinstance(result, Exception)]
+        total_bytes = sum(result for result in results.values() if not isinstance(result, Exception))
+        logger.log_time(
+            f"✅ Downloaded {len(results) - len(failed)}/{len(results)} files, "
+            f"{total_bytes / 1e6:.1f} MB in {elapsed:.1f}s ({total_bytes / 1e6 / elapsed:.1f} MB/s)"
+        )
+
+        for path in failed:
+            logger.error(f"❌ Failed to download {path}: {results[path]}")
+        # A missing normalized copy is rebuilt by build_video; a missing chunk is fatal
+        if any(not path.startswith(fixed_dir) for path in failed):
+            return []
 
         return downloaded_files
     
@@ -57,8 +102,85 @@ def download_attempt_files(org_id, interview_id, user_id, attempt, logger):
         logger.exception(f"❌ Error during download_attempt_files: {e}")
         return []
 
-def generate_transcription(user_id, questions, logger, language_code, cost_log):
-    whisper = None
+def _claim_work_dir(local_dir, attempt, logger):
+    """
+    Make local_dir hold files of this attempt only. The folder is shared by
+    every attempt of a respondent and survives failed runs, so files left by
+    another attempt are removed before anything in it is reused. process.log
+    is kept: the running session is already writing to it.
+    """
+    os.makedirs(local_dir, exist_ok=True)
+    owner = _work_dir_attempt(local_dir)
+    if owner != str(attempt):
+        stale = [name for name in os.listdir(local_dir) if name != "process.log"]
+        if stale:
+            logger.info(f"🧹 Clearing {len(stale)} leftover file(s) of attempt {owner or 'unknown'}")
+        for name in stale:
+            path = os.path.join(local_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        with open(os.path.join(local_dir, ".attempt"), "w") as f:
+            f.write(str(attempt))
+
+def _work_dir_attempt(local_dir):
+    """Attempt whose files local_dir holds, as written by _claim_work_dir, or None."""
+    try:
+        with open(os.path.join(local_dir, ".attempt")) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _attempt_blobs(bucket, interview_id, user_id, attempt, logger):
+    """
+    Chunk blobs of an attempt as (blob, filename, is_fixed_copy, size).
+
+    One listing of the attempt prefix is reconciled with the attempt_chunks
+    manifest: chunks in GCS that were never confirmed (e.g. a direct upload
+    whose /api/chunk-uploaded call was lost) are logged and added to the
+    manifest instead of being dropped. Attempts recorded before the manifest
+    existed use the listing alone.
+    """
+    prefix = f"{interview_id}/respondents/{user_id}/attempt_{attempt}/"
+    listed = [blob for blob in list_blobs(bucket, prefix) if blob.name.endswith(".webm")]
+
+    chunks = get_attempt_chunks(interview_id, user_id, attempt)
+    if chunks is None:
+        logger.info(f"ℹ️ No manifest for attempt {attempt}, using the GCS listing")
+    recorded = {(c["question_num"], c["chunk_index"]) for c in chunks or []}
+
+    entries = []
+    found = set()
+    for blob in listed:
+        filename = blob.name.split("/")[-1]
+        fixed = "/fixed/" in blob.name
+        match = re.fullmatch(r"(\d+)_(\d+)\.webm", filename)
+        if not match:
+            continue
+        if not fixed:
+            key = tuple(map(int, match.groups()))
+            found.add(key)
+            if chunks is not None and key not in recorded:
+                logger.error(f"⚠️ Recovered unconfirmed chunk {filename} from GCS, adding it to the manifest")
+                try:
+                    record_chunk(interview_id, user_id, attempt, key[0], key[1], blob.size)
+                except Exception as e:
+                    logger.error(f"❌ Failed to record recovered chunk {filename}: {e}")
+        entries.append((blob, filename, fixed, blob.size))
+
+    for question_num, chunk_index in sorted(recorded - found):
+        logger.error(f"❌ Chunk {question_num}_{chunk_index}.webm is in the manifest but missing from GCS")
+
+    return entries
+
+def generate_transcription(user_id, questions, logger, language_code, cost_log, stored=None, on_chunk=None):
+    """
+    stored: {(question_num, chunk_index): chunk_results row} from incremental
+    processing or an earlier run; those chunks are not sent to Deepgram again.
+    on_chunk: called as on_chunk(question_num, chunk_idx, result) for every
+    chunk transcribed now (result is None for silent chunks).
+    """
     openai_client = None
 
     try:
@@ -68,19 +190,14 @@ def generate_transcription(user_id, questions, logger, language_code, cost_log):
         logger.exception(f"❌ Failed to initialize OpenAI: {e}")
         return None
     
-    try:
-        whisper = init_whisper()
-        logger.log_time(f"✅ Whisper is ready")
-    except Exception as e:
-        logger.exception(f"❌ Failed to initialize Whisper: {e}")
-        return None
-
     grouped = _group_chunks(user_id, logger)
     if grouped == {}:
         logger.exception(f"❌ Failed to group chunks")
         return None
     logger.log_time(f"✅ Chunks grouped")
     logger.log_time(f"{grouped}")
+    results = _transcribe_chunks(user_id, grouped, language_code, logger, stored or {}, on_chunk)
+    logger.log_time(f"✅ Chunks transcribed")
     data = []
 
     for question_num, chunks in grouped.items():
@@ -88,51 +205,19 @@ def generate_transcription(user_id, questions, logger, language_code, cost_log):
         expected = questions[question_num]["expected"]
         transcription = ""
 
-        # Detect lang
-        # with open(wav_file, "rb") as buffer:
-        #         response = openai_client.audio.transcriptions.create(
-        #             model="whisper-1",
-        #             file=buffer,
-        #             response_format="verbose_json"
-        #         )
-        # logger.log_time(f"STT response: {response.text}")
-        # logger.log_time(response)
-
-        # language = response.language
-        openai_client = None
-        try:
-            openai_client = init_openai()
-            logger.log_time(f"✅ OpenAI client is ready")
-        except Exception as e:
-            logger.exception(f"❌ Failed to initialize OpenAI client: {e}")
-            return None
-        
+        # Assemble in chunk order regardless of completion order
         for chunk_idx in chunks:
-            file = f"temp/{user_id}/{question_num}_{chunk_idx}.webm"
-            wav_file = f"temp/{user_id}/{question_num}_{chunk_idx}.wav"
-            
-            try:
-                convert_webm_to_wav(file, wav_file)
-
-                if silence_prob(wav_file, whisper, language_code) > 0.45:
-                    logger.exception(f"⚠️ Skipped silent or unclear chunk: {file}")
-                    continue
-
-                logger.log_time(f"Speech detected on {question_num}_{chunk_idx}.wav")
-
-                text, deepgram_price, duration = deepgram_transcribe(wav_file, language_code)
-                cost_log["deepgram"].append({
-                    "type": "translate",
-                    "sec": round(duration, 2),
-                    "price": round(deepgram_price, 6)
-                })
-                if text is None:
-                    logger.exception(f"⚠️ Skipped corrupt or unreadable chunk: {file}")
-                    continue
-                if len(text.strip()) > 1:
-                    transcription += str(text) + " "
-            except Exception as e:
-                logger.exception(f"❌ Transcription failed for {file}: {e}")
+            result = results.get((question_num, chunk_idx))
+            if result is None:
+                continue
+            text, deepgram_price, duration = result
+            cost_log["deepgram"].append({
+                "type": "translate",
+                "sec": round(duration, 2),
+                "price": round(deepgram_price, 6)
+            })
+            if text is not None and len(text.strip()) > 1:
+                transcription += str(text) + " "
 
         if transcription == "":
             transcription = "No answer provided"
@@ -155,6 +240,156 @@ def generate_transcription(user_id, questions, logger, language_code, cost_log):
         
     return data
 
+def _transcribe_chunks(user_id, grouped, language_code, logger, stored, on_chunk=None):
+    """
+    Decode + VAD every chunk in the process pool, at most job_share() at a
+    time, then send chunks with speech to Deepgram on a bounded thread pool as
+    soon as they are ready. Chunks with a stored 'done' or 'silent' result are
+    taken as is.
+
+    Returns:
+        dict: {(question_num, chunk_idx): (text, deepgram_price, duration)} for
+        every chunk that reached Deepgram.
+    """
+    results = {}
+    process_pool = get_process_pool()
+    limit = job_share()
+
+    with ThreadPoolExecutor(max_workers=TRANSCRIBE_THREADS) as stt_pool:
+        todo = []
+        for question_num, chunks in grouped.items():
+            for chunk_idx in chunks:
+                row = stored.get((question_num, chunk_idx))
+                if row and row["status"] == "done":
+                    results[(question_num, chunk_idx)] = (row["transcript"], row["stt_price"], row["stt_duration_sec"])
+                    continue
+                if row and row["status"] == "silent":
+                    continue
+                todo.append((question_num, chunk_idx))
+
+        # Keep at most job_share() decodes of this job in the shared process
+        # pool, and hand each one to Deepgram as soon as it finishes.
+        prepared = {}
+        transcribing = {}
+        while todo or prepared:
+            while todo and len(prepared) < limit:
+                question_num, chunk_idx = todo.pop(0)
+                file = f"temp/{user_id}/{question_num}_{chunk_idx}.webm"
+                wav_file = f"temp/{user_id}/{question_num}_{chunk_idx}.wav" if DEEPGRAM_AUDIO_SOURCE == "wav" else None
+                prepared[process_pool.submit(prepare_chunk_audio, file, wav_file)] = (question_num, chunk_idx)
+
+            done, _ = wait(prepared, return_when=FIRST_COMPLETED)
+            for future in done:
+                question_num, chunk_idx = prepared.pop(future)
+                file = f"temp/{user_id}/{question_num}_{chunk_idx}.webm"
+                try:
+                    audio, vad = future.result()
+                except Exception as e:
+                    logger.exception(f"❌ Transcription failed for {file}: {e}")
+                    continue
+                transcribing[stt_pool.submit(_transcribe_chunk, file, audio, vad, language_code)] = (question_num, chunk_idx)
+
+        for future in as_completed(transcribing):
+            question_num, chunk_idx = transcribing[future]
+            file = f"temp/{user_id}/{question_num}_{chunk_idx}.webm"
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.exception(f"❌ Transcription failed for {file}: {e}")
+                continue
+
+            if on_chunk:
+                try:
+                    on_chunk(question_num, chunk_idx, result)
+                except Exception as e:
+                    logger.exception(f"⚠️ Failed to checkpoint {file}: {e}")
+
+            if result is None:
+                logger.exception(f"⚠️ Skipped silent or unclear chunk: {file}")
+                continue
+
+            results[(question_num, chunk_idx)] = result
+            if result[0] is None:
+                logger.exception(f"⚠️ Skipped corrupt or unreadable chunk: {file}")
+            else:
+                logger.log_time(f"Speech transcribed on {question_num}_{chunk_idx}.wav")
+
+    return results
+
+def process_uploaded_chunk(org_id, interview_id, uuid, attempt, question_num, chunk_index, language_code):
+    """
+    Incremental processing of one chunk right after upload: normalize it and run
+    VAD + transcription in parallel, upload the normalized copy if it had to be
+    re-encoded, and store the outcome in chunk_results.
+
+    Returns:
+        str: Stored status ('done', 'silent' or 'failed').
+    """
+    bucket = get_bucket(org_id)
+    gcs_path = chunk_path(interview_id, uuid, attempt, question_num, chunk_index)
+    name = f"{question_num}_{chunk_index}.webm"
+
+    # One folder per chunk: chunk jobs of the same respondent run concurrently
+    local_dir = f"temp/chunks/{uuid}/{attempt}_{question_num}_{chunk_index}"
+    os.makedirs(local_dir, exist_ok=True)
+    src = os.path.join(local_dir, name)
+    fixed = os.path.join(local_dir, f"fixed_{name}")
+    wav = src.replace(".webm", ".wav") if DEEPGRAM_AUDIO_SOURCE == "wav" else None
+
+    try:
+        bucket.blob(gcs_path).download_to_filename(src)
+
+        process_pool = get_process_pool()
+        normalizing = process_pool.submit(normalize_chunk, src, fixed)
+        audio, vad = process_pool.submit(prepare_chunk_audio, src, wav).result()
+        result = _transcribe_chunk(src, audio, vad, language_code)
+
+        normalized = normalizing.result()
+        reencoded = bool(normalized and normalized[0])
+        if reencoded:
+            fixed_path = gcs_path.replace(f"/{name}", f"/fixed/{name}")
+            upload_file_to_path(bucket, fixed_path, fixed)
+
+        if result is None:
+            status, text, price, duration = "silent", None, 0.0, 0.0
+        else:
+            text, price, duration = result
+            status = "failed" if text is None else "done"
+
+        save_chunk_result(interview_id, uuid, attempt, question_num, chunk_index, status, text, price, duration, reencoded)
+        return status
+    finally:
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+def _transcribe_chunk(file, audio, vad, language_code):
+    """
+    audio is the wav path (legacy flow) or the in-memory PCM / None returned
+    by prepare_chunk_audio. In the in-memory flow Deepgram gets either the
+    trimmed PCM or the chunk's opus track; nothing is written to disk.
+    """
+    if not _has_speech(audio, vad, language_code):
+        return None
+
+    if isinstance(audio, str):
+        if VAD_TRIM_SILENCE:
+            audio = trim_to_speech(audio, vad["segments"])
+        return deepgram_transcribe(audio, language_code)
+
+    if VAD_TRIM_SILENCE:
+        pcm = trim_pcm_to_speech(audio, vad["segments"], VAD_SAMPLE_RATE)
+        return deepgram_transcribe(pcm, language_code, sample_rate=VAD_SAMPLE_RATE)
+
+    return deepgram_transcribe(extract_audio_webm(file), language_code, content_type="audio/webm")
+
+def _has_speech(audio, vad, language_code):
+    # Cheap VAD decides clear cases; only borderline chunks pay for a Whisper pass
+    if vad["speech_ratio"] < VAD_SILENT_BELOW:
+        return False
+    if vad["speech_ratio"] < VAD_CONFIRM_BELOW:
+        samples = audio if isinstance(audio, str) else pcm_to_samples(audio)
+        return silence_prob(samples, language=language_code) <= 0.45
+    return True
+
 def _fix_transcription(transcription, question, expected, openai_client):
     prompt = f"""
 The respondent's answer was transcribed by AI and may contain minor recognition errors.
@@ -180,7 +415,7 @@ def _group_chunks(user_id, logger=None):
 
     try:
         files = sorted([
-            f for f in os.listdir(folder) if re.match(r"\d+_\d+\.webm", f)
+            f for f in os.listdir(folder) if re.fullmatch(r"\d+_\d+\.webm", f)
         ], key=lambda f: tuple(map(int, f[:-5].split("_"))))
     except Exception as e:
         if logger: logger.exception(f"❌ Failed to sort chunk filenames in {folder}: {e}")
@@ -201,7 +436,18 @@ def _group_chunks(user_id, logger=None):
 
     return dict(grouped)
 
-def rate_answer_set(data, logger, language_name, cost_log):
+def rate_answer_set(data, logger, language_name, cost_log, mode=None):
+    """
+    Rate every answer and summarize the interview.
+
+    mode (RATE_MODE env, default "batched"):
+        "batched"  - one request rates all answers and writes the summary;
+                     items that fail validation fall back to per-item calls
+        "parallel" - per-answer requests on RATE_THREADS threads, paced by the
+                     process-wide OpenAI rate limiter, then a summary request
+        "per_item" - one request per answer, then a separate summary request
+    """
+    mode = mode or RATE_MODE
     openai_client = None
     try:
         openai_client = init_openai()
@@ -209,11 +455,25 @@ def rate_answer_set(data, logger, language_name, cost_log):
     except Exception as e:
         logger.exception(f"❌ Failed to initialize OpenAI client: {e}")
         return None
-    
-    rated = []
 
-    for item in data:
-        prompt = f"""
+    summary = None
+    if mode == "batched":
+        rated, summary = _rate_batch(data, openai_client, logger, language_name, cost_log)
+    elif mode == "parallel":
+        rated = _rate_parallel(data, openai_client, logger, language_name, cost_log)
+    else:
+        rated = [_rate_item(item, openai_client, logger, language_name, cost_log) for item in data]
+
+    if summary is None:
+        summary = summarize_interview(rated, openai_client, logger, language_name, cost_log)
+    logger.log_time(f"✅ Summary success | Rate {summary['rate']}")
+    return {
+        "interview": rated,
+        "summary": summary
+    }
+
+def _rate_item(item, openai_client, logger, language_name, cost_log):
+    prompt = f"""
 You are evaluating an interview fragment. The input is in {language_name}. The review must also be in {language_name}.
 
 Question: {item["question"]}
@@ -235,33 +495,150 @@ Respond strictly in JSON in {language_name}:
 
 Do not include any formatting like ```json. Return plain valid JSON only.
 """
-        response, in_price, out_price = respond_with_ai(prompt, openai_client, 4000)
+    # One rate and a review of at most 255 characters; the reservation counts against TPM
+    response, in_price, out_price = respond_with_ai(prompt, openai_client, 400)
+    cost_log["gpt"].append({
+        "type": "review",
+        "token_in_price": round(in_price, 6),
+        "token_out_price": round(out_price, 6),
+        "total_price": round(in_price + out_price, 6)
+    })
+    try:
+        parsed = json.loads(
+            extract_json_block(response)
+        )
+        item["rate"] = parsed.get("rate")
+        item["review"] = parsed.get("review")
+    except Exception as e:
+        logger.exception(f"❌ Failed to parse GPT response: {e}")
+        item["rate"] = 1
+        item["review"] = "Failed to review."
+
+    logger.log_time(f"✅ Question successfully rated | Question: {item['question']} | Rate {item['rate']}")
+    return item
+
+def _rate_parallel(data, openai_client, logger, language_name, cost_log):
+    # Each item logs into its own cost list so cost_log stays in question order
+    item_logs = [{"gpt": []} for _ in data]
+    with ThreadPoolExecutor(max_workers=RATE_THREADS) as pool:
+        rated = list(pool.map(
+            lambda pair: _rate_item(pair[0], openai_client, logger, language_name, pair[1]),
+            zip(data, item_logs)
+        ))
+    for item_log in item_logs:
+        cost_log["gpt"].extend(item_log["gpt"])
+    return rated
+
+def _rate_batch(data, openai_client, logger, language_name, cost_log):
+    """
+    Rate all answers and summarize in a single request.
+
+    Returns:
+        tuple: (rated items, summary or None if the summary failed validation)
+    """
+    prompt = f"You are evaluating a full interview. The input is in {language_name}. All reviews must also be in {language_name}.\n\n"
+
+    for index, item in enumerate(data):
+        prompt += (
+            f"[{index}]\n"
+            f"Question: {item['question']}\n"
+            f"Expected answer: {item['expected']}\n"
+            f"Respondent's answer: {item['answer']}\n\n"
+        )
+
+    prompt += f"""
+1. Rate each respondent's answer on a scale from 1 to 5:
+5 - fully matches expectations
+4 - mostly matches
+3 - partially matches
+2 - off-topic
+1 - missing or inappropriate
+2. Give an overall interview score from 1 to 5.
+3. Write a short summary (max 500 characters) analyzing the respondent’s behavior and answers.
+
+Respond strictly in JSON in {language_name}, with one entry per answer, using the same index:
+{{
+  "items": [
+    {{
+      "index": <answer index>,
+      "rate": <number from 1 to 5>,
+      "review": "<short explanation, max 255 characters, in {language_name}>"
+    }}
+  ],
+  "summary": {{
+    "rate": <number from 1 to 5>,
+    "review": "<summary in {language_name}, max 500 characters>"
+  }}
+}}
+
+Do not include markdown or ```json - return only valid JSON.
+"""
+    response, in_price, out_price = respond_with_ai(prompt, openai_client, max_tokens=400 * len(data) + 1000)
+
+    parsed_items = {}
+    summary = None
+    try:
+        parsed = json.loads(extract_json_block(response))
+        for entry in parsed.get("items", []):
+            if _valid_rating(entry) and isinstance(entry.get("index"), int):
+                parsed_items[entry["index"]] = entry
+        if _valid_rating(parsed.get("summary")):
+            summary = {"rate": parsed["summary"]["rate"], "review": parsed["summary"]["review"]}
+    except Exception as e:
+        logger.exception(f"❌ Failed to parse batched GPT response: {e}")
+
+    # Attribute the single request back to items: input by prompt share, output by review length
+    in_weights = [len(item["question"]) + len(item["expected"]) + len(item["answer"]) for item in data]
+    out_weights = [len(parsed_items[i]["review"]) if i in parsed_items else 0 for i in range(len(data))]
+    if summary:
+        out_weights.append(len(summary["review"]))
+    if not any(out_weights):
+        out_weights = [1] * len(out_weights)
+    in_total = sum(in_weights) or 1
+    out_total = sum(out_weights) or 1
+
+    rated = []
+    for index, item in enumerate(data):
+        item_in = in_price * in_weights[index] / in_total
+        item_out = out_price * out_weights[index] / out_total
         cost_log["gpt"].append({
             "type": "review",
-            "token_in_price": round(in_price, 6),
-            "token_out_price": round(out_price, 6),
-            "total_price": round(in_price + out_price, 6)
+            "batched": True,
+            "token_in_price": round(item_in, 6),
+            "token_out_price": round(item_out, 6),
+            "total_price": round(item_in + item_out, 6)
         })
-        try:
-            parsed = json.loads(
-                extract_json_block(response)
-            )
-            item["rate"] = parsed.get("rate")
-            item["review"] = parsed.get("review")
-        except Exception as e:
-            logger.exception("❌ Failed to parse GPT response:", e)
-            item["rate"] = 1
-            item["review"] = "Failed to review."
 
+        entry = parsed_items.get(index)
+        if entry is None:
+            logger.info(f"⚠️ Batched rating missing for question {index}, rating separately")
+            rated.append(_rate_item(item, openai_client, logger, language_name, cost_log))
+            continue
+
+        item["rate"] = entry["rate"]
+        item["review"] = entry["review"]
         rated.append(item)
         logger.log_time(f"✅ Question successfully rated | Question: {item['question']} | Rate {item['rate']}")
-    
-    summary = summarize_interview(rated, openai_client, logger, language_name, cost_log)
-    logger.log_time(f"✅ Summary success | Rate {summary['rate']}")
-    return {
-        "interview": rated,
-        "summary": summary
-    }
+
+    if summary:
+        summary_out = out_price * out_weights[-1] / out_total
+        cost_log["gpt"].append({
+            "type": "summarize",
+            "batched": True,
+            "token_in_price": 0.0,
+            "token_out_price": round(summary_out, 6),
+            "total_price": round(summary_out, 6)
+        })
+
+    return rated, summary
+
+def _valid_rating(entry):
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("rate"), (int, float))
+        and 1 <= entry["rate"] <= 5
+        and isinstance(entry.get("review"), str)
+    )
 
 def summarize_interview(rated, openai_client, logger, language_name, cost_log):
     prompt = f"Below are interview answers in {language_name}:\n\n"
@@ -313,42 +690,48 @@ def extract_json_block(text):
         return match.group(0)
     raise ValueError("No JSON block found in GPT response")
 
-def build_video(user_id, total_question_count, logger):
+def build_video(user_id, total_question_count, logger, attempt=None):
     logger.info(f"Building video...")
     directory = f"temp/{user_id}"
     fixed_dir = os.path.join(directory, "fixed")
     os.makedirs(fixed_dir, exist_ok=True)
+    output_path = os.path.join(directory, "interview.webm")
+
+    # A failed earlier run may have left its output behind; never reuse it
+    if os.path.exists(output_path):
+        os.remove(output_path)
 
     webm_files = sort_webm_files(user_id)
-    inputs = []
-    filters = []
+    parts = []
+    infos = []
     timecodes = {f"q{i}": None for i in range(total_question_count)}
     current_time = 0.0
     previous_part = None
     first_timestamp_written = False
 
-    stream_index = 0  # use this instead of enumerate
-    for webm in webm_files:
-        part_number = int(webm.split("_")[0])
-        src_path = os.path.join(directory, webm)
-        fixed_path = os.path.join(fixed_dir, f"fixed_{webm}")
+    # Chunks are independent: normalize them on the process pool, then walk the
+    # results in file order so timecodes come out exactly as before
+    # Normalized copies are only reused when the folder belongs to this attempt
+    reuse = attempt is not None and _work_dir_attempt(directory) == str(attempt)
+    futures = run_bounded(normalize_chunk, [
+        (os.path.join(directory, webm), os.path.join(fixed_dir, f"fixed_{webm}"), reuse)
+        for webm in webm_files
+    ])
 
-        fix_required = needs_fixing(src_path)
-        if fix_required is None:
-            logger.info(f"⚠️ Skipping unreadable file: {webm}")
-            continue
+    for webm, future in zip(webm_files, futures):
+        fixed_path = os.path.join(fixed_dir, f"fixed_{webm}")
         try:
-            if fix_required:
-                reencode_webm(src_path, fixed_path)
-            else:
-                subprocess.run(["cp", src_path, fixed_path], check=True)
-        except subprocess.CalledProcessError:
+            result = future.result()
+        except Exception:
             logger.exception(f"❌ Failed to prepare {webm}, skipping.")
             continue
+        if result is None:
+            logger.info(f"⚠️ Skipping unreadable file: {webm}")
+            continue
 
-        inputs.extend(["-i", fixed_path])
-        filters.append(f"[{stream_index}:v:0][{stream_index}:a:0]")
-        stream_index += 1
+        _, info = result
+        parts.append(fixed_path)
+        infos.append(info)
 
         # Timecode logic
         part_number = int(webm.split("_")[0])
@@ -359,7 +742,7 @@ def build_video(user_id, total_question_count, logger):
             
         previous_part = part_number
 
-        duration = get_real_duration(fixed_path)
+        duration = info.format_duration
         if not first_timestamp_written:
             timecodes[f"q{part_number}"] = "0:00"
             first_timestamp_written = True
@@ -372,27 +755,57 @@ def build_video(user_id, total_question_count, logger):
         previous_part = part_number
         logger.log_time(f"✅ {webm} fixed")
 
-    if not filters:
+    if not parts:
         logger.exception(f"❌ No valid chunks found for user {user_id}. Skipping concat.")
         return []
 
-    # Prepare filter_complex
-    filter_concat = ''.join(filters) + f"concat=n={len(filters)}:v=1:a=1[outv][outa]"
+    if VIDEO_CONCAT_COPY and concat_copy(_match_stream_params(parts, infos, logger), output_path):
+        logger.log_time(f"✅ Video stream-copied & timecodes ready")
+        return timecodes
 
-    output_path = os.path.join(directory, "interview.webm")
-
-    cmd = ["ffmpeg", "-y"] + inputs + [
-        "-filter_complex", filter_concat,
-        "-map", "[outv]", "-map", "[outa]",
-        "-c:v", "libvpx", "-b:v", "1M", "-c:a", "libopus",
-        output_path
-    ]
-
-    subprocess.run(cmd, check=True)
+    concat_reencode(parts, output_path)
     logger.log_time(f"✅ Video built & timecodes ready")
     return timecodes
 
-def upload_interview(user_id, respondent_id, interview_id, org_id, data, logger):
+def _match_stream_params(parts, infos, logger):
+    """
+    Bring every chunk to the stream parameters most chunks already share, so
+    they can be joined with -c copy. Only the odd ones out are re-encoded.
+    """
+    target = Counter(info.stream_params for info in infos).most_common(1)[0][0]
+    like = next(info for info in infos if info.stream_params == target)
+
+    mismatched = [i for i, info in enumerate(infos) if info.stream_params != target]
+    matched = list(parts)
+    futures = run_bounded(reencode_webm, [
+        (parts[i], parts[i].replace("fixed_", "matched_"), like) for i in mismatched
+    ])
+
+    for i, future in zip(mismatched, futures):
+        try:
+            future.result()
+            matched[i] = parts[i].replace("fixed_", "matched_")
+            logger.log_time(f"🔁 {os.path.basename(parts[i])} re-encoded to match {target}")
+        except Exception:
+            # concat_copy will reject the mismatch and build_video falls back to a full re-encode
+            logger.exception(f"❌ Failed to match {parts[i]}, keeping original")
+    return matched
+
+def upload_interview_video(user_id, interview_id, org_id):
+    upload_file_to_path(
+        get_bucket(org_id), 
+        f"{interview_id}/respondents/{user_id}/interview.webm", 
+        f"temp/{user_id}/interview.webm"
+    )
+
+def upload_interview(user_id, respondent_id, interview_id, org_id, data, logger, upload_video=True):
+    """
+    Store the review, upload the video (unless already uploaded) and the log,
+    and mark the respondent processed.
+
+    Returns:
+        bool: True if the respondent was marked processed.
+    """
     try:
         if not isinstance(data, dict):
             logger.exception(f"❌ Review data invalid")
@@ -405,13 +818,10 @@ def upload_interview(user_id, respondent_id, interview_id, org_id, data, logger)
                 f"temp/{user_id}/process.log"
             )
             update_respondent_status(respondent_id, "error")
-            return
+            return False
         
-        upload_file_to_path(
-            get_bucket(org_id), 
-            f"{interview_id}/respondents/{user_id}/interview.webm", 
-            f"temp/{user_id}/interview.webm"
-        )
+        if upload_video:
+            upload_interview_video(user_id, interview_id, org_id)
 
         upload_file_to_path(
             get_bucket(org_id), 
@@ -420,6 +830,7 @@ def upload_interview(user_id, respondent_id, interview_id, org_id, data, logger)
         )
 
         update_respondent_status(respondent_id, "processed")
+        return True
 
     except:
         update_respondent_status(respondent_id, "error")
@@ -429,6 +840,7 @@ def upload_interview(user_id, respondent_id, interview_id, org_id, data, logger)
             f"{interview_id}/respondents/{user_id}/process.log", 
             f"temp/{user_id}/process.log"
         )
+        return False
 
 def insert_review(respondent_id, interview_id, data_json, logger):
     try:
@@ -437,6 +849,7 @@ def insert_review(respondent_id, interview_id, data_json, logger):
             INSERT INTO reviews (
                 respondent_id, interview_id, review_data
             ) VALUES (%s, %s, %s)
+            ON CONFLICT (respondent_id) DO UPDATE SET review_data = EXCLUDED.review_data
             RETURNING *
             """,
             (respondent_id, interview_id, data_json),
@@ -463,6 +876,7 @@ def summarize_cost(cost_log, processing_time_sec):
 
 
 def insert_interview_cost(respondent_id, interview_id, org_id, cost_log, logger):
+    """Insert the cost row. Errors propagate so the billing transaction rolls back as a whole."""
     try:
         return run_query(
             """
@@ -488,4 +902,4 @@ def insert_interview_cost(respondent_id, interview_id, org_id, cost_log, logger)
         )
     except Exception as e:
         logger.exception(f"❌ Failed to insert interview cost for respondent {respondent_id}: {e}")
-        return None
+        raise
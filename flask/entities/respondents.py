@@ -1,6 +1,7 @@
 import json
 from atoms import run_query
-from atoms import get_bucket, create_empty_blob, list_blobs, get_last_attempt
+from atoms import get_bucket, create_empty_blob
+from .attempts import allocate_attempt
 from google.api_core.exceptions import Forbidden, GoogleAPIError
 
 def get_respondent_review(respondent_id):
@@ -218,17 +219,22 @@ def create_respondent_folder(org_id, interview_id, respondent_uuid):
     return base_path
 
 
-def create_respondent_attempt_folder(org_id, interview_id, respondent_uuid):
+def create_respondent_attempt_folder(org_id, interview_id, respondent_uuid, new_respondent=False):
     """
-    Creates a versioned attempt folder for a respondent and marks it with a `.ready` file.
+    Creates a versioned attempt folder for a respondent.
+    The attempt number comes from the respondent_attempts manifest, so the
+    attempt is usable as soon as it is allocated; readiness is known here and
+    never needs to be polled.
 
     Args:
         org_id (int): Organization ID.
         interview_id (int): Interview ID.
         respondent_uuid (str): UUID used for pathing.
+        new_respondent (bool): Just created, so there are no older attempts to look up.
 
     Returns:
-        str: Full path of the created attempt folder.
+        tuple: (attempt folder path, attempt number, ready). ready is False
+        when the attempt was allocated but its GCS folder marker couldn't be written.
 
     Raises:
         PermissionError or RuntimeError on failure.
@@ -236,29 +242,21 @@ def create_respondent_attempt_folder(org_id, interview_id, respondent_uuid):
     try:
         bucket = get_bucket(org_id)
         base_prefix = f"{interview_id}/respondents/{respondent_uuid}/"
-        blobs = list_blobs(bucket, prefix=base_prefix)
-
-        attempt_nums = set()
-        for blob in blobs:
-            parts = blob.name[len(base_prefix):].split('/')
-            if parts and parts[0].startswith("attempt_"):
-                try:
-                    attempt_num = int(parts[0].split("_")[1])
-                    attempt_nums.add(attempt_num)
-                except ValueError:
-                    continue
-
-        next_attempt = get_last_attempt(org_id, interview_id, respondent_uuid) + 1
+        next_attempt = allocate_attempt(org_id, interview_id, respondent_uuid, new_respondent)
         attempt_path = f"{base_prefix}attempt_{next_attempt}/"
-        create_empty_blob(bucket, attempt_path)
-        create_empty_blob(bucket, f"{attempt_path}.ready")
-
-        print(f"📁 Created attempt folder: {attempt_path}")
-        return attempt_path, next_attempt
-
     except Forbidden:
         raise PermissionError("GCS write access forbidden")
     except GoogleAPIError as e:
         raise RuntimeError(f"GCS error: {e}")
     except Exception as e:
         raise RuntimeError(f"Unexpected error: {e}")
+
+    try:
+        create_empty_blob(bucket, attempt_path)
+    except GoogleAPIError as e:
+        # Chunk uploads don't need the marker; report it instead of failing the attempt
+        print(f"⚠️ Attempt {next_attempt} allocated but folder marker failed: {e}")
+        return attempt_path, next_attempt, False
+
+    print(f"📁 Created attempt folder: {attempt_path}")
+    return attempt_path, next_attempt, True
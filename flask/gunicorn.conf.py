@@ -0,0 +1,53 @@
+# Production HTTP server: gunicorn -c gunicorn.conf.py app:app
+#
+# Only HTTP requests are served here. Interview processing and question
+# builds run in worker.py (see compose.yaml), so a slow job never holds an
+# HTTP worker. `kill -HUP <master pid>` reloads workers gracefully.
+import os, multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.getenv('FLASK_SERVER_PORT', 9091)}"
+
+# Request handlers mostly wait on Postgres and GCS, so threads go further than processes
+worker_class = "gthread"
+
+# Every worker opens its own DB pool of up to POSTGRESQL_POOL_MAX connections,
+# so workers x pool max must fit in Postgres max_connections, minus what
+# worker.py, migrations and psql need (POSTGRESQL_RESERVED_CONNECTIONS).
+# With the defaults: (100 - 20) // 10 = 8 workers at most.
+def _default_workers():
+    pool_max = int(os.getenv("POSTGRESQL_POOL_MAX", 10))
+    budget = int(os.getenv("POSTGRESQL_MAX_CONNECTIONS", 100)) - int(os.getenv("POSTGRESQL_RESERVED_CONNECTIONS", 20))
+    return max(min(multiprocessing.cpu_count() * 2 + 1, budget // pool_max), 1)
+
+workers = int(os.getenv("GUNICORN_WORKERS", _default_workers()))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Chunk uploads stream up to ~15 s of video, keep the timeout well above that
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# Import the app once in the master; workers fork with modules and config loaded.
+# Connections are not shared: the DB pool, storage client and HTTP sessions
+# are created per process (they check os.getpid()).
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+def post_worker_init(worker):
+    # Build credentials before the first request instead of during it
+    from atoms.storage import get_client
+    get_client()
+
+def worker_exit(server, worker):
+    from atoms.db import close_pool
+    close_pool()
@@ -1,4 +1,5 @@
-from entities.answers import save_chunk as save_chunk_entity
+from entities.answers import save_chunk as save_chunk_entity, confirm_chunk
+from entities.jobs import enqueue_job
 
 class AnswersManager:
     def __init__(self, org_id, interview_id, respondent_hash):
@@ -14,15 +15,17 @@ class AnswersManager:
         self.interview_id = interview_id
         self.respondent_hash = respondent_hash
 
-    def save_chunk(self, attempt, question_num, chunk_index, file_storage):
+    def save_chunk(self, attempt, question_num, chunk_index, stream, md5=None, size=None):
         """
-        Save a recorded chunk to the proper GCS path.
+        Stream a recorded chunk to the proper GCS path.
 
         Args:
             attempt (int): Attempt number.
             question_num (int): Which question.
             chunk_index (int): Slice index (15s intervals).
-            file_storage (werkzeug.datastructures.FileStorage): Uploaded chunk.
+            stream (file-like): Chunk bytes, e.g. FileStorage.stream or request.stream.
+            md5 (str, optional): Base64 MD5 of the chunk computed by the client.
+            size (int, optional): Chunk length in bytes, if known.
 
         Returns:
             bool: Success.
@@ -34,5 +37,44 @@ class AnswersManager:
             attempt,
             question_num,
             chunk_index,
-            file_storage
+            stream,
+            md5,
+            size
+        )
+
+    def confirm_chunk(self, attempt, question_num, chunk_index):
+        """
+        Acknowledge a chunk the browser uploaded directly to GCS via a signed URL.
+
+        Returns:
+            bool: True if the chunk exists in GCS.
+        """
+        return confirm_chunk(
+            self.org_id,
+            self.interview_id,
+            self.respondent_hash,
+            attempt,
+            question_num,
+            chunk_index
+        )
+
+    def queue_chunk_processing(self, attempt, question_num, chunk_index):
+        """
+        Queue normalization, VAD and transcription of an uploaded chunk so only
+        rating, concatenation and summary are left when the interview closes.
+
+        Returns:
+            int: Job ID.
+        """
+        return enqueue_job(
+            "process_chunk",
+            {
+                "organization_id": self.org_id,
+                "interview_id": self.interview_id,
+                "user_id": self.respondent_hash,
+                "attempt": attempt,
+                "question_num": question_num,
+                "chunk_index": chunk_index
+            },
+            org_id=int(self.org_id)
         )
@@ -1,5 +1,5 @@
-from entities.gen_interview import generate_interview_from_text, detect_language, generate_interview_from_questions, prepare_interview_folder, record_interview_questions, upload_interview_audio 
-from entities.interviews import create_interview_with_questions
+from entities.gen_interview import generate_interview_from_text, detect_language, generate_interview_from_questions, prepare_interview_folder, record_and_upload_questions, get_recorded_question_nums
+from entities.interviews import create_interview_with_questions, get_interview_by_id, get_interview_questions
 
 class InterviewGenerator:
     def __init__(self, org_id):
@@ -13,6 +13,29 @@ class InterviewGenerator:
         self.thank_you_url = None
         self.contact_required = False
         self.video_required = True
+        self.question_status = {}
+
+    @classmethod
+    def from_interview(cls, org_id, interview_id):
+        """Load an already inserted interview, e.g. to resume its build."""
+        interview = get_interview_by_id(org_id, interview_id)
+        if not interview:
+            raise ValueError("Interview not found")
+
+        generator = cls(org_id)
+        generator.interview_id = interview_id
+        generator.language = interview["language"]
+        generator.display_name = interview["display_name"]
+        generator.description = interview["description_text"]
+        generator.thank_you_text = interview["thank_you_text"]
+        generator.thank_you_url = interview["thank_you_url"]
+        generator.contact_required = interview["contact_required"]
+        generator.video_required = interview["video_required"]
+        generator.questions = [
+            {"question": q["question"], "expected": q["expected"]}
+            for q in get_interview_questions(interview_id)
+        ]
+        return generator
 
     def from_raw_text(self, raw_text):
         result = generate_interview_from_text(raw_text)
@@ -74,19 +97,28 @@ class InterviewGenerator:
             "video_required": self.video_required
         }
     
-    def build(self):
+    def build(self, resume=False):
+        """
+        Synthesize and upload question audio. With resume=True, questions whose
+        audio is already in GCS are skipped, so a partially failed build only
+        redoes the missing ones.
+        """
+        recorded = set()
         try:
+            # Idempotent, and a retried build may have failed before the markers were written
             prepare_interview_folder(self.org_id, self.interview_id)
+            if resume:
+                recorded = get_recorded_question_nums(self.org_id, self.interview_id)
         except Exception as e:
             raise RuntimeError(f"❌ Failed to create folder structure: {e}")
 
         try:
-            blobs = record_interview_questions(self.questions)
+            self.question_status = record_and_upload_questions(
+                self.org_id, self.interview_id, self.questions, skip=recorded
+            )
         except Exception as e:
             raise RuntimeError(f"❌ Failed to synthesize questions: {e}")
 
-        try:
-            upload_interview_audio(self.org_id, self.interview_id, blobs)
-        except Exception as e:
-            raise RuntimeError(f"❌ Failed to upload audio: {e}")
-
+        failed = [idx for idx, status in self.question_status.items() if status == "failed"]
+        if failed:
+            raise RuntimeError(f"❌ Failed to record questions {failed}, resume the build to retry them")
@@ -0,0 +1,151 @@
+from entities import claim_job, complete_job, fail_job, defer_job, count_attempt_jobs, requeue_stale_jobs, get_interview_by_id, process_uploaded_chunk
+from services.process_manager import ProcessManager
+from services.interview_generator import InterviewGenerator
+import os, socket, threading, time, traceback
+
+CHUNK_WAIT_MAX_SEC = float(os.getenv("CHUNK_WAIT_MAX_SEC", 600))  # longest a process job waits for the attempt's chunk jobs
+CHUNK_WAIT_POLL_SEC = float(os.getenv("CHUNK_WAIT_POLL_SEC", 5))
+
+def process_interview_job(payload, retry=False):
+    # Retries resume on their own from the stage checkpoints of the attempt
+    process = ProcessManager(
+        payload["organization_id"],
+        payload["interview_id"],
+        payload["user_id"],
+        payload["attempt"],
+        payload.get("integration")
+    )
+    if not process.valid:
+        raise RuntimeError("ProcessManager validation failed")
+    if not process.process():
+        raise RuntimeError("Interview processing failed")
+
+def process_chunk_job(payload, retry=False):
+    if count_attempt_jobs("process_interview", payload["interview_id"], payload["user_id"], payload["attempt"], ("running", "done")):
+        # Too late: the full run transcribes this chunk itself
+        print(f"⏭️ Chunk {payload['question_num']}_{payload['chunk_index']} of {payload['user_id']}: attempt already processing, skipped")
+        return
+    interview = get_interview_by_id(payload["organization_id"], payload["interview_id"])
+    if interview is None:
+        raise RuntimeError(f"Interview {payload['interview_id']} not found")
+    status = process_uploaded_chunk(
+        payload["organization_id"],
+        payload["interview_id"],
+        payload["user_id"],
+        payload["attempt"],
+        payload["question_num"],
+        payload["chunk_index"],
+        interview["language"]
+    )
+    print(f"🧩 Chunk {payload['question_num']}_{payload['chunk_index']} of {payload['user_id']}: {status}")
+
+def build_interview_job(payload, retry=False):
+    # A retry keeps the question audio the failed run already uploaded
+    generator = InterviewGenerator.from_interview(payload["organization_id"], payload["interview_id"])
+    generator.build(resume=retry or payload.get("resume", False))
+    print(f"✅ Interview #{payload['interview_id']} built successfully")
+
+def chunk_jobs_pending(payload):
+    return count_attempt_jobs("process_chunk", payload["interview_id"], payload["user_id"], payload["attempt"]) > 0
+
+# Kind -> check that holds a claimed job back while it returns True
+WAIT_FOR = {
+    "process_interview": chunk_jobs_pending,
+}
+
+HANDLERS = {
+    "process_interview": process_interview_job,
+    "process_chunk": process_chunk_job,
+    "build_interview": build_interview_job,
+}
+
+class JobWorker:
+    def __init__(self, concurrency=None, poll_interval=None, stale_after=None, backoff=None, kinds=None):
+        """
+        Pulls jobs from the `jobs` table and runs them on a fixed number of threads.
+
+        Args:
+            concurrency (int): Jobs run at the same time (WORKER_CONCURRENCY, default 2).
+            poll_interval (float): Seconds to sleep when the queue is empty (WORKER_POLL_SEC, default 2).
+            stale_after (float): Seconds after which a 'running' job is considered abandoned (JOB_TIMEOUT_SEC, default 3600).
+            backoff (float): Base retry delay in seconds (JOB_RETRY_BACKOFF_SEC, default 60).
+            kinds (list, optional): Only claim these job kinds.
+        """
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", 2))
+        self.poll_interval = poll_interval or float(os.getenv("WORKER_POLL_SEC", 2))
+        self.stale_after = stale_after or float(os.getenv("JOB_TIMEOUT_SEC", 3600))
+        self.backoff = backoff or float(os.getenv("JOB_RETRY_BACKOFF_SEC", 60))
+        self.kinds = kinds or list(HANDLERS)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        print(f"👷 Worker {self.worker_id} starting with {self.concurrency} slot(s)")
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, args=(f"{self.worker_id}/{i}",), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Stop claiming new jobs; running jobs are allowed to finish."""
+        self.stop_event.set()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _loop(self, slot_id):
+        last_sweep = 0
+        while not self.stop_event.is_set():
+            try:
+                if time.time() - last_sweep > 60:
+                    requeued = requeue_stale_jobs(self.stale_after)
+                    if requeued:
+                        print(f"♻️ Re-queued {requeued} stale job(s)")
+                    last_sweep = time.time()
+
+                job = claim_job(slot_id, self.kinds)
+            except Exception as e:
+                print(f"❌ Failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                self.stop_event.wait(self.poll_interval)
+                continue
+
+            self._run(job)
+
+    def _run(self, job):
+        if self._should_wait(job):
+            return
+        print(f"▶️ Job #{job['id']} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']}")
+        try:
+            HANDLERS[job["kind"]](job["payload"], retry=job["attempts"] > 1)
+            complete_job(job["id"])
+            print(f"✅ Job #{job['id']} done")
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                retry = fail_job(job, e, self.backoff)
+                print(f"❌ Job #{job['id']} failed: {e}" + (" - will retry" if retry else ""))
+            except Exception as db_error:
+                print(f"❌ Failed to record failure of job #{job['id']}: {db_error}")
+
+    def _should_wait(self, job):
+        """
+        Defer the job (without using up an attempt) while its WAIT_FOR check
+        holds, for at most CHUNK_WAIT_MAX_SEC after it was enqueued.
+        """
+        check = WAIT_FOR.get(job["kind"])
+        if check is None or job["age_sec"] >= CHUNK_WAIT_MAX_SEC:
+            return False
+        try:
+            if not check(job["payload"]):
+                return False
+            defer_job(job, CHUNK_WAIT_POLL_SEC)
+        except Exception as e:
+            print(f"❌ Failed to check or defer job #{job['id']}, running it now: {e}")
+            return False
+        print(f"⏳ Job #{job['id']} ({job['kind']}) waiting for chunk jobs of the attempt")
+        return True
@@ -1,5 +1,6 @@
 from utils.logger import LogManager
 from utils.integration import run_integration
+from atoms import transaction
 import openai, os, shutil, time, json
 from entities import (
     update_respondent_status,
@@ -8,11 +9,17 @@ from entities import (
     get_closed_respondent_id,
     get_questions_expected,
     download_attempt_files,
+    get_latest_attempt,
+    get_chunk_results,
     generate_transcription,
     rate_answer_set,
     build_video,
     set_respondent_score,
     upload_interview,
+    upload_interview_video,
+    save_chunk_result,
+    save_checkpoint,
+    get_checkpoints,
     summarize_cost,
     insert_interview_cost,
     deduct_balance
@@ -38,6 +45,9 @@ class ProcessManager:
             "deepgram": [],
             "gpt": []
         }
+        self.checkpoints = {}
+        self.failed_chunks = []
+        self.downloaded = False
 
         try:
             self._validate_inputs()
@@ -105,65 +115,193 @@ class ProcessManager:
 
         return True
     
+    def _stored_chunk_results(self):
+        # Chunks already transcribed by incremental processing (see process_chunk jobs)
+        if not self.attempt:
+            return {}
+        try:
+            stored = get_chunk_results(self.interview_id, self.user_id, int(self.attempt))
+            if stored:
+                self.logger.info(f"♻️ Reusing {len(stored)} incrementally processed chunk(s)")
+            return stored
+        except Exception as e:
+            self.logger.error(f"❌ Failed to load chunk results, transcribing everything: {e}")
+            return {}
+
     def _validate_inputs(self):
         if not all([self.organization_id, self.interview_id, self.user_id]):
             raise ValueError("Missing required process parameters.")
         
     def process(self):
+        """
+        Run the pipeline. Each stage (transcription, rating, video, upload,
+        billing) is checkpointed per respondent + attempt, so a re-run after a
+        failure resumes at the first unfinished stage instead of paying for
+        Deepgram and OpenAI again.
+        """
         if not self.valid:
             return False
-        
-        time.sleep(10)
 
         self.logger.info("✅ Interview processing started")
         self.logger.start_timer()
 
-        if download_attempt_files(self.organization_id, self.interview_id, self.user_id, self.attempt, self.logger) == []:
-            self.logger.error("❌ Downloading step failed - stopping.")
-            return
+        if not self.attempt:
+            self.attempt = get_latest_attempt(self.organization_id, self.interview_id, self.user_id)
+            self.logger.info(f"🔁 No attempt provided, using last found attempt: {self.attempt}")
+            if self.attempt == 0:
+                self.logger.error("❌ No attempts found for respondent.")
+                return False
+        self.attempt = int(self.attempt)
+        self.checkpoints = self._load_checkpoints()
 
-        self.logger.info(f"✅ Files downloading complete")
-        
-        data = generate_transcription(self.user_id, self.questions, self.logger, self.language_code, self.cost_log)
+        data = self._stage("transcription", self._transcribe)
         self.logger.info(f"✅ Cost log update")
         self.logger.info(self.cost_log)
         if not data:
             self.logger.error("❌ Transcription step failed - stopping.")
-            return
-        else:
-            data = rate_answer_set(data, self.logger, self.language_name, self.cost_log)
-            self.logger.info(f"✅ Rating step complete")
-            self.logger.info(f"✅ Cost log update")
-            self.logger.info(self.cost_log)
-        
-        timecodes = build_video(self.user_id, len(data["interview"]), self.logger)
-        if timecodes != {}:
-            self.logger.info(f"✅ Video processing step complete")
-            data["timecodes"] = timecodes
-            set_respondent_score(self.respondent_id, data["summary"]["rate"])
-            upload_interview(self.user_id, self.respondent_id, self.interview_id, self.organization_id, data, self.logger)
-
-            summarize_cost(self.cost_log, round(time.time() - self.start_time, 2))
-            try:
-                deducted_amount = deduct_balance(
-                    self.organization_id, 
-                    (self.cost_log["duration_sec"] / 60)
-                )
-                self.logger.info(f'Deducted ${deducted_amount}')
-            except Exception as e:
-                self.logger.error(f"❌ Billing deduction failed: {e}")
+            return False
+
+        data = self._stage("rating", lambda: rate_answer_set(data, self.logger, self.language_name, self.cost_log))
+        if not data:
+            self.logger.error("❌ Rating step failed - stopping.")
+            return False
+        self.logger.info(f"✅ Rating step complete")
+        self.logger.info(f"✅ Cost log update")
+        self.logger.info(self.cost_log)
 
-            insert_interview_cost(self.respondent_id, self.interview_id, self.organization_id, self.cost_log, self.logger)
-            shutil.rmtree(f"temp/{self.user_id}")
-            self.logger.info(f"✅ Upload completed")
-            self.logger.info(f'Rate: {data["summary"]["rate"]}, Review: {data["summary"]["rate"]}')
+        video = self._stage("video", lambda: self._build_video(len(data["interview"])))
+        if not video:
+            self.logger.error("❌ Video processing step failed - stopping.")
+            return False
+        self.logger.info(f"✅ Video processing step complete")
+        data["timecodes"] = video["timecodes"]
+
+        set_respondent_score(self.respondent_id, data["summary"]["rate"])
+        uploaded = self._stage("upload", lambda: upload_interview(
+            self.user_id, self.respondent_id, self.interview_id, self.organization_id, data, self.logger, upload_video=False
+        ))
+        if not uploaded:
+            self.logger.error("❌ Upload step failed - stopping.")
+            return False
+
+        if not self._bill():
+            self.logger.error("❌ Billing step failed - stopping.")
+            return False
+        shutil.rmtree(f"temp/{self.user_id}", ignore_errors=True)
+        self.logger.info(f"✅ Upload completed")
+        self.logger.info(f'Rate: {data["summary"]["rate"]}, Review: {data["summary"]["rate"]}')
+        if self.integration:
             run_integration(
                 self.integration,
                 score=data["summary"]["rate"],
                 review=data["summary"]["review"],
                 logger=self.logger
             )
+        return True
 
-                
-            
-            
+    def _load_checkpoints(self):
+        try:
+            checkpoints = get_checkpoints(self.interview_id, self.user_id, self.attempt)
+        except Exception as e:
+            self.logger.error(f"❌ Failed to load checkpoints, running every stage: {e}")
+            return {}
+        if checkpoints:
+            self.logger.info(f"♻️ Resuming attempt {self.attempt}, completed stages: {', '.join(checkpoints)}")
+        return checkpoints
+
+    def _stage(self, name, run):
+        """
+        Return the checkpointed output of a stage, or run it and checkpoint the
+        output together with the cost entries it added, so resumed runs still
+        report the full spend.
+        """
+        if name in self.checkpoints:
+            checkpoint = self.checkpoints[name]
+            for kind, entries in checkpoint.get("cost", {}).items():
+                self.cost_log[kind].extend(entries)
+            self.logger.info(f"⏭️ Stage '{name}' already done, skipping")
+            return checkpoint["result"]
+
+        before = {kind: len(entries) for kind, entries in self.cost_log.items()}
+        result = run()
+        if result:
+            cost = {kind: self.cost_log[kind][before[kind]:] for kind in before}
+            try:
+                save_checkpoint(self.interview_id, self.user_id, self.attempt, name, {"result": result, "cost": cost})
+            except Exception as e:
+                self.logger.error(f"❌ Failed to checkpoint stage '{name}': {e}")
+        return result
+
+    def _download(self):
+        if not self.downloaded:
+            self.downloaded = download_attempt_files(self.organization_id, self.interview_id, self.user_id, self.attempt, self.logger) != []
+            if self.downloaded:
+                self.logger.info(f"✅ Files downloading complete")
+            else:
+                self.logger.error("❌ Downloading step failed - stopping.")
+        return self.downloaded
+
+    def _transcribe(self):
+        if not self._download():
+            return None
+        self.failed_chunks = []
+        data = generate_transcription(
+            self.user_id, self.questions, self.logger, self.language_code, self.cost_log,
+            stored=self._stored_chunk_results(),
+            on_chunk=self._save_chunk
+        )
+        if data and self.failed_chunks:
+            # Not checkpointed: the retry redoes only the failed chunks
+            failed = ", ".join(f"{q}_{c}" for q, c in self.failed_chunks)
+            self.logger.error(f"❌ Deepgram failed on chunk(s) {failed}, failing the stage so it is retried")
+            return None
+        return data
+
+    def _save_chunk(self, question_num, chunk_index, result):
+        # Per-chunk checkpoint: a failure later in the stage doesn't re-pay Deepgram
+        if result is None:
+            save_chunk_result(self.interview_id, self.user_id, self.attempt, question_num, chunk_index, "silent")
+            return
+        text, price, duration = result
+        status = "failed" if text is None else "done"
+        if status == "failed":
+            self.failed_chunks.append((question_num, chunk_index))
+        save_chunk_result(self.interview_id, self.user_id, self.attempt, question_num, chunk_index, status, text, price, duration)
+
+    def _build_video(self, question_count):
+        if not self._download():
+            return None
+        timecodes = build_video(self.user_id, question_count, self.logger, self.attempt)
+        if not timecodes:
+            return None
+        # Upload right away: the checkpoint is only valid once the video is in GCS
+        upload_interview_video(self.user_id, self.interview_id, self.organization_id)
+        return {"timecodes": timecodes}
+
+    def _bill(self):
+        """
+        Deduct the balance, insert the cost row and checkpoint 'billing' in one
+        transaction: either all three are committed or none is, and a failure
+        is retried with the job.
+
+        Returns:
+            bool: True if billing is done.
+        """
+        if "billing" in self.checkpoints:
+            self.logger.info(f"⏭️ Stage 'billing' already done, skipping")
+            return True
+
+        summarize_cost(self.cost_log, round(time.time() - self.start_time, 2))
+        try:
+            with transaction():
+                deducted_amount = deduct_balance(
+                    self.organization_id, 
+                    (self.cost_log["duration_sec"] / 60)
+                )
+                insert_interview_cost(self.respondent_id, self.interview_id, self.organization_id, self.cost_log, self.logger)
+                save_checkpoint(self.interview_id, self.user_id, self.attempt, "billing", {"result": True})
+        except Exception as e:
+            self.logger.error(f"❌ Billing failed, nothing was charged: {e}")
+            return False
+        self.logger.info(f'Deducted ${deducted_amount}')
+        return True
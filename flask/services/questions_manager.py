@@ -1,9 +1,9 @@
 from entities import (
     get_questions,
-    get_question_audio_url,
+    get_question_audio_urls,
     create_respondent_folder,
     create_respondent_attempt_folder,
-    wait_for_attempt_ready
+    get_chunk_upload_urls
 )
 
 class QuestionsManager:
@@ -14,34 +14,40 @@ class QuestionsManager:
         self.respondent_exists = respondent_exists
 
     def prepare_respondent(self):
+        """
+        Create the respondent's next attempt.
+
+        Returns:
+            tuple: (attempt number, ready). Allocation is synchronous, so
+            readiness is known on return.
+        """
         if not self.respondent_exists:
             create_respondent_folder(self.org_id, self.interview_id, self.respondent_hash)
 
-        self.attempt_path, attempt_num = create_respondent_attempt_folder(
-            self.org_id, self.interview_id, self.respondent_hash
+        self.attempt_path, attempt_num, ready = create_respondent_attempt_folder(
+            self.org_id, self.interview_id, self.respondent_hash, new_respondent=not self.respondent_exists
         )
 
-        return attempt_num
+        return attempt_num, ready
+
+    def get_questions(self):
+        return get_questions(self.interview_id)
+
+    def generate_signed_urls(self, questions, expiration=3600):
+        return get_question_audio_urls(
+            self.org_id,
+            self.interview_id,
+            [q["question_num"] for q in questions],
+            expiration
+        )
 
-    def wait_for_ready(self, attempt_num, timeout=10):
-        return wait_for_attempt_ready(
+    def generate_upload_urls(self, attempt_num, questions, chunks, expiration=3600):
+        return get_chunk_upload_urls(
             self.org_id,
             self.interview_id,
             self.respondent_hash,
             attempt_num,
-            timeout
+            [q["question_num"] for q in questions],
+            chunks,
+            expiration
         )
-
-    def get_questions(self):
-        return get_questions(self.interview_id)
-
-    def generate_signed_urls(self, questions, expiration=3600):
-        return [
-            get_question_audio_url(
-                self.org_id,
-                self.interview_id,
-                q["question_num"],
-                expiration
-            )
-            for q in questions
-        ]
@@ -0,0 +1,61 @@
+import os, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROCESS_POOL_SIZE = int(os.getenv("PROCESS_POOL_SIZE", os.cpu_count() or 1))
+JOB_PROCESS_SHARE = int(os.getenv("JOB_PROCESS_SHARE", 0))  # pool slots one job may fill; 0 = pool size / WORKER_CONCURRENCY
+
+_process_pool = None
+_process_pool_pid = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """
+    Return the shared process pool for CPU-bound media work (ffmpeg decode, VAD).
+
+    Workers are spawned rather than forked: the parent runs threads and holds
+    DB/HTTP connections that must not be duplicated into children.
+    """
+    global _process_pool, _process_pool_pid
+    if _process_pool is not None and _process_pool_pid == os.getpid():
+        return _process_pool
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_pid != os.getpid():
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _process_pool_pid = os.getpid()
+    return _process_pool
+
+def job_share():
+    """Number of pool tasks a single job keeps in flight."""
+    if JOB_PROCESS_SHARE > 0:
+        return JOB_PROCESS_SHARE
+    return max(PROCESS_POOL_SIZE // int(os.getenv("WORKER_CONCURRENCY", 2)), 1)
+
+def run_bounded(fn, args_list, limit=None):
+    """
+    Run fn(*args) for every args tuple on the shared process pool, with at most
+    `limit` (default job_share()) tasks of this call queued or running at once,
+    so concurrent jobs share the pool instead of one job flooding it.
+
+    Returns:
+        list: Completed futures, in the order of args_list.
+    """
+    pool = get_process_pool()
+    limit = limit or job_share()
+    futures = []
+    pending = set()
+
+    for args in args_list:
+        if len(pending) >= limit:
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        future = pool.submit(fn, *args)
+        futures.append(future)
+        pending.add(future)
+
+    wait(pending)
+    return futures
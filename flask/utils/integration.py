@@ -1,4 +1,4 @@
-import requests
+from atoms.http_client import http_post
 
 def moodle(integration, score, review, logger):
     url = integration.get("api")
@@ -20,7 +20,7 @@ def moodle(integration, score, review, logger):
     }
 
     try:
-        res = requests.post(url, headers=headers, json=payload, timeout=15)
+        res = http_post(url, headers=headers, json=payload, timeout=15)
         if res.status_code == 200:
             logger.info("✅ Moodle push succeeded")
             return True
@@ -0,0 +1,24 @@
+from dotenv import load_dotenv
+import argparse, signal
+
+load_dotenv()
+
+from services.job_worker import JobWorker
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run background job worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs processed in parallel (default: WORKER_CONCURRENCY or 2)")
+    parser.add_argument("--kind", action="append", dest="kinds", help="Only run jobs of this kind (repeatable)")
+    args = parser.parse_args()
+
+    worker = JobWorker(concurrency=args.concurrency, kinds=args.kinds)
+
+    def shutdown(signum, frame):
+        print("🛑 Stopping worker, waiting for running jobs...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    worker.start()
+    worker.join()